@@ -1,12 +1,33 @@
 """
 Shared APIs Module
-Handles Synonyms and Transliteration API calls
+Handles Synonyms and Transliteration API calls (async via httpx/HTTP2)
 """
 
 import os
-import requests
+import re
 import json
+import asyncio
+import httpx
+from cachetools import TTLCache, LRUCache
+from threading import RLock
 from dotenv import load_dotenv
+from tenacity import retry, stop_after_attempt, wait_exponential_jitter, retry_if_exception_type
+
+try:
+    from shelved_cache import PersistentCache
+    HAS_SHELVED_CACHE = True
+except ImportError:
+    HAS_SHELVED_CACHE = False
+    # Silent - persistence is optional; caches fall back to in-memory
+
+try:
+    import orjson
+    _json_dumps = orjson.dumps  # bytes are fine as a request body
+    _json_loads = orjson.loads
+except ImportError:
+    # orjson is optional - fall back to stdlib json
+    _json_dumps = json.dumps
+    _json_loads = json.loads
 
 # Load environment variables from .env file
 load_dotenv()
@@ -15,99 +36,432 @@ load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1/models/gemini-2.5-flash:generateContent"
 
-def get_synonyms(word, lang="telugu"):
+# Full request URL built once at import - no per-call f-string formatting
+_GEMINI_URL = f"{GEMINI_API_URL}?key={GEMINI_API_KEY}"
+
+# Precompiled patterns for the synonym-parsing fallback path - compiling
+# per call is wasted work when Gemini returns markdown-wrapped text often
+_MD_STRIP = re.compile(r'^```(?:json)?\s*|\s*```$', re.M)
+_SYN_EXTRACT = re.compile(r'["\']([^"\']+)["\']|([\u0C00-\u0C7F]+)')
+
+# Strips whitespace and stray wrapping quotes from both ends in one
+# C-level pass (replaces strip().strip('\'').strip() chains)
+_EDGE_QUOTES = re.compile(r'^[\s\'"]+|[\s\'"]+$')
+
+# Single-character class used by the cheap input validators below -
+# one C-level scan instead of a Python generator over every character
+_TELUGU_CHAR = re.compile(r'[\u0C00-\u0C7F]')
+
+# Shared async client (created lazily). With HTTP/2 every concurrent
+# request is multiplexed over a single TLS connection to the Gemini
+# host, so a get_synonyms_many fan-out costs one handshake, not dozens.
+_client = None
+
+async def _get_client():
+    """Get or create the shared httpx client"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+            timeout=10.0,
+            headers={"Content-Type": "application/json"},
+        )
+    return _client
+
+async def close_client():
+    """Close the shared client (call on shutdown)"""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+class TransientAPIError(Exception):
+    """Raised for retryable Gemini responses (429/5xx)"""
+
+# Statuses worth retrying - auth/validation errors (400/401/403) are not
+_RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+@retry(stop=stop_after_attempt(4),
+       wait=wait_exponential_jitter(initial=0.25, max=4),
+       retry=retry_if_exception_type((TransientAPIError, httpx.TransportError)),
+       reraise=True)
+async def _post_with_retry(client, url, payload, timeout=10):
+    """
+    POST to Gemini, retrying transient failures with exponential backoff
+
+    Returns:
+        Tuple of (status, body bytes). Non-retryable errors (e.g. 403)
+        are returned as-is for the caller to handle.
+    """
+    response = await client.post(url, content=_json_dumps(payload), timeout=timeout)
+    if response.status_code in _RETRYABLE_STATUSES:
+        raise TransientAPIError(f"Gemini API transient error: {response.status_code}")
+    return response.status_code, response.content
+
+# Directory for disk-backed caches (survives process restarts)
+_CACHE_DIR = os.path.join(os.path.dirname(__file__), ".cache")
+
+def _make_cache(cache_cls, filename, **kwargs):
+    """
+    Build a cache, disk-backed via shelved_cache when available
+
+    Persistent caches survive deploys/restarts, avoiding a cold storm
+    of Gemini calls. Falls back to a plain in-memory cache if the
+    shelf cannot be opened (e.g. read-only filesystem).
+    """
+    if HAS_SHELVED_CACHE:
+        try:
+            os.makedirs(_CACHE_DIR, exist_ok=True)
+            return PersistentCache(cache_cls,
+                                   filename=os.path.join(_CACHE_DIR, filename),
+                                   **kwargs)
+        except Exception as e:
+            print(f"Warning: could not open persistent cache {filename}: {e}")
+    return cache_cls(**kwargs)
+
+# TTL cache for synonym lookups - repeated words become dict lookups
+# instead of Gemini round trips. Keyed on (word, lang), 7-day TTL.
+_synonyms_cache = _make_cache(TTLCache, "gemini_synonyms.db", maxsize=10000, ttl=7 * 86400)
+_synonyms_cache_lock = RLock()
+
+# Singleflight map: concurrent identical lookups collapse onto one
+# in-flight request instead of each hitting Gemini on a cold cache
+_synonyms_inflight = {}
+
+# Negative cache: words Gemini answered with an empty list (on a real
+# 200, not an error) are dead ends - don't re-ask for an hour. Kept
+# separate from the positive cache so empties expire much sooner.
+_synonyms_neg_cache = TTLCache(maxsize=16384, ttl=3600)
+
+async def get_synonyms(word, lang="telugu", client=None):
     """
-    Get synonyms for a word using Gemini API
-    
+    Get synonyms for a word using Gemini API (cached)
+
+    Results are memoized in a TTL cache keyed on (word, lang) so
+    repeated lookups skip the network entirely. Only successful (HTTP
+    200) responses are cached - transient failures stay uncached so
+    they are retried next time.
+
     Args:
         word: Word to find synonyms for
         lang: Language (default: telugu)
-        
+        client: Optional httpx.AsyncClient to reuse (falls back to shared client)
+
     Returns:
         List of synonyms
     """
     if not word or not word.strip():
         return []
-    
-    word = word.strip()
-    
+
+    word = word.strip().casefold()
+
+    # Cheap early rejects - no point burning a network call (and its
+    # 10s timeout) on single characters or words with no Telugu script.
+    # isascii() is a single C call that skips the scan entirely.
+    if len(word) < 2 or word.isascii() or not _TELUGU_CHAR.search(word):
+        return []
+
+    cache_key = (word, lang)
+
+    with _synonyms_cache_lock:
+        if cache_key in _synonyms_cache:
+            return _synonyms_cache[cache_key]
+        if cache_key in _synonyms_neg_cache:
+            return []
+
+    # Singleflight: if an identical lookup is already in flight, await
+    # its result instead of firing a duplicate Gemini request
+    existing = _synonyms_inflight.get(cache_key)
+    if existing is not None:
+        return await existing
+
+    future = asyncio.get_running_loop().create_future()
+    _synonyms_inflight[cache_key] = future
+
+    try:
+        synonyms = await _get_synonyms_uncached(word, client=client)
+
+        # None signals an error path (non-200 or exception) - don't cache those
+        if synonyms is None:
+            synonyms = []
+        elif synonyms:
+            with _synonyms_cache_lock:
+                _synonyms_cache[cache_key] = synonyms
+        else:
+            # Genuine empty answer from a 200 - negative-cache it
+            with _synonyms_cache_lock:
+                _synonyms_neg_cache[cache_key] = True
+
+        future.set_result(synonyms)
+        return synonyms
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        _synonyms_inflight.pop(cache_key, None)
+
+async def _get_synonyms_uncached(word, client=None):
+    """
+    Fetch synonyms from Gemini (no caching)
+
+    Returns a list on success (HTTP 200), or None on errors so the
+    caller knows not to cache the result.
+    """
     try:
         # Prepare prompt for Gemini
-        prompt = f"""Find 5-10 synonyms for the Telugu word "{word}". 
+        prompt = f"""Find 5-10 synonyms for the Telugu word "{word}".
 Return only a JSON array of synonyms in Telugu script, no explanations.
 Example format: ["synonym1", "synonym2", "synonym3"]
 If no synonyms found, return empty array []."""
 
-        # Make API request
-        url = f"{GEMINI_API_URL}?key={GEMINI_API_KEY}"
-        payload = {
-            "contents": [{
-                "parts": [{
-                    "text": prompt
-                }]
-            }]
-        }
-        
-        headers = {
-            "Content-Type": "application/json"
-        }
-        
-        response = requests.post(url, json=payload, headers=headers, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            
-            # Extract text from Gemini response
-            if 'candidates' in data and len(data['candidates']) > 0:
-                content = data['candidates'][0].get('content', {})
-                parts = content.get('parts', [])
-                if parts and 'text' in parts[0]:
-                    text_response = parts[0]['text'].strip()
-                    
-                    # Try to parse as JSON
-                    try:
-                        # Remove markdown code blocks if present
-                        text_response = text_response.replace('```json', '').replace('```', '').strip()
-                        synonyms = json.loads(text_response)
-                        if isinstance(synonyms, list):
-                            return synonyms
-                    except json.JSONDecodeError:
-                        # If not JSON, try to extract words from text
-                        import re
-                        # Extract words in quotes or Telugu script
-                        matches = re.findall(r'["\']([^"\']+)["\']|([\u0C00-\u0C7F]+)', text_response)
-                        synonyms = []
-                        for match in matches:
-                            word_found = match[0] if match[0] else match[1]
-                            if word_found and word_found != word:
-                                synonyms.append(word_found)
-                        return synonyms[:10]  # Limit to 10 synonyms
-        
-        # If API call failed, return empty list
-        if response.status_code != 200:
-            error_data = response.json() if response.headers.get('content-type', '').startswith('application/json') else {}
-            print(f"Gemini API error: {response.status_code} - {error_data}")
-        return []
-        
+        if client is None:
+            client = await _get_client()
+
+        status, body = await _post_with_retry(
+            client, _GEMINI_URL,
+            {"contents": [{"parts": [{"text": prompt}]}]},
+            timeout=10)
+
+        if status == 200:
+            data = _json_loads(body)
+
+            # EAFP: drill straight to the text instead of chained
+            # .get()s with default allocations on every call
+            try:
+                text_response = data['candidates'][0]['content']['parts'][0]['text'].strip()
+            except (KeyError, IndexError, TypeError):
+                return []
+
+            # Try to parse as JSON
+            try:
+                # Remove markdown code blocks if present
+                text_response = _MD_STRIP.sub('', text_response).strip()
+                synonyms = _json_loads(text_response)
+                if isinstance(synonyms, list):
+                    return synonyms
+            except ValueError:
+                # If not JSON, try to extract words from text
+                # (words in quotes or Telugu script). Each match is a
+                # (quoted, telugu) pair where only one group is set.
+                matches = _SYN_EXTRACT.findall(text_response)
+                return [found for m in matches
+                        if (found := m[0] or m[1]) and found != word][:10]  # Limit to 10 synonyms
+
+            return []
+
+        # If API call failed, return None so the result is not cached.
+        # Log only a bounded slice of the body - no point decoding a
+        # JSON tree just to print it.
+        print(f"Gemini API error: {status} - {body[:512].decode('utf-8', 'replace')}")
+        return None
+
     except Exception as e:
         print(f"Error getting synonyms: {e}")
+        return None
+
+async def get_synonyms_many(words, lang="telugu", concurrency=16):
+    """
+    Get synonyms for many words concurrently
+
+    Fans out one Gemini call per word with asyncio.gather, capped by a
+    semaphore so we don't trip Gemini rate limits (429s).
+
+    Args:
+        words: List of words to look up
+        lang: Language (default: telugu)
+        concurrency: Max in-flight requests (default: 16)
+
+    Returns:
+        List of synonym lists, in the same order as words
+    """
+    if not words:
         return []
 
-def transliterate_english_to_telugu(text):
+    client = await _get_client()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(word):
+        async with semaphore:
+            return await get_synonyms(word, lang=lang, client=client)
+
+    results = await asyncio.gather(*(bounded(w) for w in words), return_exceptions=True)
+    # Map failures to empty lists so one bad word doesn't sink the batch
+    return [r if isinstance(r, list) else [] for r in results]
+
+async def get_synonyms_batch(words, lang="telugu"):
     """
-    Transliterate English text to Telugu script using Gemini API
-    
+    Get synonyms for a list of words in ONE Gemini call
+
+    Coalesces K words into a single request so one network round trip
+    replaces K. The prompt asks for a JSON object mapping each word to
+    its synonym array; any words missing from the response fall back
+    to individual get_synonyms calls.
+
+    Args:
+        words: List of words to look up
+        lang: Language (default: telugu)
+
+    Returns:
+        Dict mapping each word to its list of synonyms
+    """
+    if not words:
+        return {}
+
+    words = [w.strip().casefold() for w in words if w and w.strip()]
+    if not words:
+        return {}
+
+    results = {}
+
+    try:
+        prompt = f"""Return a single JSON object mapping each of these Telugu words to a JSON array of 5-10 synonyms in Telugu script.
+Words: {json.dumps(words, ensure_ascii=False)}
+Use an empty array for words with no synonyms. Respond with JSON only, no explanations."""
+
+        client = await _get_client()
+
+        status, body = await _post_with_retry(
+            client, _GEMINI_URL,
+            {"contents": [{"parts": [{"text": prompt}]}]},
+            timeout=30)
+
+        if status == 200:
+            data = _json_loads(body)
+
+            try:
+                text_response = data['candidates'][0]['content']['parts'][0]['text']
+            except (KeyError, IndexError, TypeError):
+                text_response = None
+
+            if text_response:
+                text_response = _MD_STRIP.sub('', text_response.strip()).strip()
+                try:
+                    parsed = _json_loads(text_response)
+                    if isinstance(parsed, dict):
+                        # Only accept well-formed entries
+                        for w, syns in parsed.items():
+                            if isinstance(syns, list):
+                                results[w.strip().casefold()] = syns
+                except ValueError:
+                    pass
+        else:
+            print(f"Gemini API error: {status} - {body[:512].decode('utf-8', 'replace')}")
+
+    except Exception as e:
+        print(f"Error getting batch synonyms: {e}")
+
+    # Words the batch actually answered - only these came from a 200 and
+    # are safe to cache; everything else goes through the fallback, which
+    # applies the normal per-word caching policy itself
+    batch_answered = set(results)
+
+    # Fall back to per-word requests only for words the batch missed
+    missing = [w for w in words if w not in results]
+    if missing:
+        fallback = await get_synonyms_many(missing, lang=lang)
+        for w, syns in zip(missing, fallback):
+            results[w] = syns
+
+    # Cache the batch's own answers so later get_synonyms calls hit.
+    # Non-empty answers go in the positive cache; genuine empties get the
+    # short negative TTL, same as the per-word path. Fallback failures
+    # stay uncached so they are retried next time.
+    with _synonyms_cache_lock:
+        for w in words:
+            if w not in batch_answered:
+                continue
+            if results[w]:
+                _synonyms_cache[(w, lang)] = results[w]
+            else:
+                _synonyms_neg_cache[(w, lang)] = True
+
+    return {w: results.get(w, []) for w in words}
+
+# LRU cache for transliteration - the same short strings (common
+# words, UI labels) come through repeatedly, so cache hits skip the
+# Gemini round trip entirely. Keyed on the post-strip() text.
+_transliterate_cache = _make_cache(LRUCache, "gemini_transliterations.db", maxsize=8192)
+_transliterate_cache_lock = RLock()
+
+# Singleflight map for transliteration (see _synonyms_inflight)
+_transliterate_inflight = {}
+
+async def transliterate_english_to_telugu(text, client=None):
+    """
+    Transliterate English text to Telugu script using Gemini API (cached)
+
+    Results are memoized in an LRU cache keyed on the stripped input.
+    Only successful responses are cached; error paths return the
+    original text uncached so they are retried next time. Use
+    transliterate_english_to_telugu.cache_clear() to reset (for tests).
+
     Args:
         text: English text to transliterate (phonetic conversion)
-        
+        client: Optional httpx.AsyncClient to reuse (falls back to shared client)
+
     Returns:
         Transliterated text in Telugu script
     """
     if not text or not text.strip():
         return text
-    
+
     text = text.strip()
-    
+
+    # Cheap early rejects: text already in Telugu script needs no
+    # transliteration, and text with no letters (numbers, punctuation)
+    # would come back unchanged anyway. isascii() short-circuits the
+    # Telugu scan for the common pure-English case.
+    if not text.isascii() and _TELUGU_CHAR.search(text):
+        return text
+    if not any(c.isalpha() for c in text):
+        return text
+
+    with _transliterate_cache_lock:
+        if text in _transliterate_cache:
+            return _transliterate_cache[text]
+
+    # Singleflight: collapse concurrent identical requests onto the
+    # first one's in-flight future
+    existing = _transliterate_inflight.get(text)
+    if existing is not None:
+        return await existing
+
+    future = asyncio.get_running_loop().create_future()
+    _transliterate_inflight[text] = future
+
+    try:
+        transliterated = await _transliterate_uncached(text, client=client)
+
+        # None signals an error path (non-200 or exception) - don't cache
+        if transliterated is None:
+            transliterated = text
+        else:
+            with _transliterate_cache_lock:
+                _transliterate_cache[text] = transliterated
+
+        future.set_result(transliterated)
+        return transliterated
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        _transliterate_inflight.pop(text, None)
+
+def _transliterate_cache_clear():
+    """Clear the transliteration cache (escape hatch for tests)"""
+    with _transliterate_cache_lock:
+        _transliterate_cache.clear()
+
+transliterate_english_to_telugu.cache_clear = _transliterate_cache_clear
+
+async def _transliterate_uncached(text, client=None):
+    """
+    Transliterate via Gemini (no caching)
+
+    Returns the transliterated text on success (HTTP 200), or None on
+    errors so the caller knows not to cache the result.
+    """
     try:
         # Prepare prompt for Gemini
         prompt = f"""Transliterate the following English text to Telugu script phonetically.
@@ -118,42 +472,61 @@ Text to transliterate: "{text}"
 
 Return only the transliterated text in Telugu script, nothing else."""
 
-        # Make API request
-        url = f"{GEMINI_API_URL}?key={GEMINI_API_KEY}"
-        payload = {
-            "contents": [{
-                "parts": [{
-                    "text": prompt
-                }]
-            }]
-        }
-        
-        headers = {
-            "Content-Type": "application/json"
-        }
-        
-        response = requests.post(url, json=payload, headers=headers, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            
-            # Extract text from Gemini response
-            if 'candidates' in data and len(data['candidates']) > 0:
-                content = data['candidates'][0].get('content', {})
-                parts = content.get('parts', [])
-                if parts and 'text' in parts[0]:
-                    transliterated = parts[0]['text'].strip()
-                    # Remove any quotes if present
-                    transliterated = transliterated.strip('"').strip("'").strip()
-                    return transliterated
-        
-        # If API call failed, return original text
-        if response.status_code != 200:
-            error_data = response.json() if response.headers.get('content-type', '').startswith('application/json') else {}
-            print(f"Gemini API error: {response.status_code} - {error_data}")
-        return text
-        
+        if client is None:
+            client = await _get_client()
+
+        status, body = await _post_with_retry(
+            client, _GEMINI_URL,
+            {"contents": [{"parts": [{"text": prompt}]}]},
+            timeout=10)
+
+        if status == 200:
+            data = _json_loads(body)
+
+            # EAFP: drill straight to the text instead of chained
+            # .get()s with default allocations on every call
+            try:
+                transliterated = data['candidates'][0]['content']['parts'][0]['text']
+            except (KeyError, IndexError, TypeError):
+                return text
+
+            # Trim whitespace and any wrapping quotes in a single pass
+            return _EDGE_QUOTES.sub('', transliterated)
+
+        # If API call failed, return None so the result is not cached.
+        # Log only a bounded slice of the body - no point decoding a
+        # JSON tree just to print it.
+        print(f"Gemini API error: {status} - {body[:512].decode('utf-8', 'replace')}")
+        return None
+
     except Exception as e:
         print(f"Transliteration error: {e}")
-        return text
+        return None
+
+async def transliterate_english_to_telugu_many(texts, concurrency=16):
+    """
+    Transliterate many texts concurrently
+
+    Same fan-out pattern as get_synonyms_many: one shared client,
+    asyncio.gather with a semaphore cap.
+
+    Args:
+        texts: List of English texts to transliterate
+        concurrency: Max in-flight requests (default: 16)
+
+    Returns:
+        List of transliterated texts, in the same order as texts
+    """
+    if not texts:
+        return []
+
+    client = await _get_client()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(text):
+        async with semaphore:
+            return await transliterate_english_to_telugu(text, client=client)
 
+    results = await asyncio.gather(*(bounded(t) for t in texts), return_exceptions=True)
+    # On failure fall back to the original text (same as the single-call path)
+    return [r if isinstance(r, str) else t for r, t in zip(results, texts)]
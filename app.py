@@ -6,13 +6,24 @@ English to Telugu Translation Service
 from flask import Flask, render_template, request, send_file, jsonify, flash, session, Response, stream_with_context
 from werkzeug.utils import secure_filename
 import os
+import shutil
+import logging
 import tempfile
+import threading
+import queue
+import zipfile
+import concurrent.futures
+import xml.etree.ElementTree as ET
+import html
 from pathlib import Path
+from functools import lru_cache
 from docx import Document
+from docx.oxml.ns import qn
 import traceback
 import json
 import uuid
 from datetime import datetime
+from collections import defaultdict
 
 # Import new modules
 from translate_docx_unified import UnifiedDOCXTranslator
@@ -21,7 +32,12 @@ from auth import authenticate, get_user_id
 from feedback_logging import log_translation, log_feedback
 
 try:
-    from supabase_config import save_feedback
+    # get_comments/delete_comment are aliased because the view functions
+    # below reuse those names and would otherwise rebind them
+    from supabase_config import (save_feedback, save_comment,
+                                 get_comments as sb_get_comments,
+                                 delete_comment as sb_delete_comment,
+                                 get_supabase_client)
     HAS_SUPABASE = True
 except ImportError:
     HAS_SUPABASE = False
@@ -34,7 +50,68 @@ except ImportError:
     HAS_FLASK_SESSION = False
     print("Warning: flask-session not installed. Using default session.")
 
+# Optional Celery + Redis task queue. When REDIS_URL is set and celery is
+# installed, translations run in dedicated worker processes (start with:
+#   celery -A app.celery worker -Q translate,indictrans2
+# ) so the Flask process stays light and fan-out scales by adding
+# workers. Without Redis we fall back to the in-process thread pool.
+REDIS_URL = os.getenv("REDIS_URL", "")
+
+try:
+    import redis as redis_lib
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+
+_redis_client = None
+
+def get_redis():
+    """Get the shared Redis client, or None when Redis is not configured"""
+    global _redis_client
+    if not (HAS_REDIS and REDIS_URL):
+        return None
+    if _redis_client is None:
+        _redis_client = redis_lib.Redis.from_url(REDIS_URL, decode_responses=True)
+    return _redis_client
+
+try:
+    from celery import Celery
+    HAS_CELERY = True
+except ImportError:
+    HAS_CELERY = False
+
+USE_CELERY = HAS_CELERY and bool(REDIS_URL)
+
+if USE_CELERY:
+    celery = Celery("context_translation", broker=REDIS_URL, backend=REDIS_URL)
+
+# Hot request paths log through the logging module (deferred %-formatting,
+# level-gated) instead of print; default to INFO outside of debugging
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper())
+log = logging.getLogger(__name__)
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+    # Fall back to Flask's stdlib-json provider
+
 app = Flask(__name__)
+
+if HAS_ORJSON:
+    from flask.json.provider import DefaultJSONProvider
+
+    class OrjsonProvider(DefaultJSONProvider):
+        """JSON provider backed by orjson (SIMD serializer)"""
+
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, default=self.default).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = OrjsonProvider(app)
 app.config['SECRET_KEY'] = os.getenv("FLASK_SECRET_KEY", "your-secret-key-here-change-in-production")
 app.config['MAX_CONTENT_LENGTH'] = int(os.getenv("FLASK_MAX_CONTENT_LENGTH", 50 * 1024 * 1024))  # 50MB max file size
 app.config['UPLOAD_FOLDER'] = tempfile.gettempdir()
@@ -44,17 +121,317 @@ if HAS_FLASK_SESSION:
     Session(app)
 
 # Allowed file extensions
-ALLOWED_EXTENSIONS = {'docx'}
+@lru_cache(maxsize=1)
+def _engines():
+    """
+    Cached engine availability map
+
+    Availability is probed once per process; POST /engines/refresh
+    clears the cache if engines are installed or repaired at runtime.
+    """
+    return get_available_engines()
+
+ALLOWED_SUFFIXES = ('.docx',)
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return filename.lower().endswith(ALLOWED_SUFFIXES)
+
+# In-process session stores. LRU-capped so a long-lived worker cannot
+# balloon even if the TTL janitor falls behind; Redis (when configured)
+# holds the authoritative copies with their own TTL.
+try:
+    from cachetools import LRUCache
+    file_mappings = LRUCache(maxsize=10000)
+    translation_metadata = LRUCache(maxsize=10000)  # translation_id -> {user_id, engine, etc.}
+except ImportError:
+    file_mappings = {}
+    translation_metadata = {}  # translation_id -> {user_id, engine, etc.}
+
+# TTL for per-translation state mirrored into Redis (seconds)
+SESSION_TTL = 3600
+
+# Per-session listener queues for the SSE stream endpoint
+_status_queues = {}
+_status_queues_lock = threading.Lock()
+
+def _publish_status_event(translation_id, engine, status):
+    """Push a status change to SSE listeners (local queues + Redis pub/sub)"""
+    event = {'engine': engine, 'status': status}
+    with _status_queues_lock:
+        listeners = list(_status_queues.get(translation_id, []))
+    for listener in listeners:
+        listener.put(event)
+    r = get_redis()
+    if r is not None:
+        # Celery workers live in other processes; pub/sub carries their
+        # updates back to the Flask process serving the SSE stream
+        r.publish(f"fm:{translation_id}:events", json.dumps(event))
+
+def _set_engine_status(translation_id, engine, status):
+    """Record an engine's status for a translation session"""
+    session_state = file_mappings.get(translation_id)
+    if session_state is not None:
+        session_state['status'][engine] = status
+    r = get_redis()
+    if r is not None:
+        key = f"fm:{translation_id}:status"
+        r.hset(key, engine, status)
+        r.expire(key, SESSION_TTL)
+    _publish_status_event(translation_id, engine, status)
+
+def _set_engine_result(translation_id, engine, result):
+    """Record an engine's translation result for a session"""
+    session_state = file_mappings.get(translation_id)
+    if session_state is not None:
+        session_state['translations'][engine] = result
+    r = get_redis()
+    if r is not None:
+        key = f"fm:{translation_id}:trans"
+        r.hset(key, engine, json.dumps(result))
+        r.expire(key, SESSION_TTL)
+
+def _get_session_state(translation_id):
+    """
+    Get (status, translations) for a session from memory and/or Redis
+
+    Celery workers only write to Redis, so when Redis is configured its
+    values overlay the in-process dicts. Returns (None, None) when the
+    session is unknown.
+    """
+    status = None
+    translations = None
+
+    if translation_id in file_mappings:
+        file_info = file_mappings[translation_id]
+        status = dict(file_info.get('status', {}))
+        translations = dict(file_info.get('translations', {}))
+
+    r = get_redis()
+    if r is not None:
+        redis_status = r.hgetall(f"fm:{translation_id}:status")
+        if redis_status:
+            if status is None:
+                status = {}
+                translations = {}
+            status.update(redis_status)
+            for engine, value in r.hgetall(f"fm:{translation_id}:trans").items():
+                translations[engine] = json.loads(value)
+
+    return status, translations
+
+def _init_session(translation_id, input_path, original_text, engines, user_id):
+    """Create per-translation session state in memory and Redis"""
+    file_mappings[translation_id] = {
+        'input_path': input_path,
+        'original_text': original_text,
+        'translations': {},
+        'status': {engine: 'pending' for engine in engines}
+    }
+
+    translation_metadata[translation_id] = {
+        'user_id': user_id,
+        'engines': engines,
+        'created_at': datetime.now().isoformat()
+    }
+
+    r = get_redis()
+    if r is not None:
+        base_key = f"fm:{translation_id}"
+        r.hset(base_key, mapping={
+            'input_path': input_path,
+            'original_text': original_text
+        })
+        r.expire(base_key, SESSION_TTL)
+
+        status_key = f"fm:{translation_id}:status"
+        r.hset(status_key, mapping={engine: 'pending' for engine in engines})
+        r.expire(status_key, SESSION_TTL)
+
+        meta_key = f"meta:{translation_id}"
+        r.hset(meta_key, mapping={
+            'user_id': user_id,
+            'engines': json.dumps(engines),
+            'created_at': datetime.now().isoformat()
+        })
+        r.expire(meta_key, SESSION_TTL)
+
+def _get_session_field(translation_id, field):
+    """Get a base session field (input_path, original_text, ...) or None"""
+    file_info = file_mappings.get(translation_id)
+    if file_info is not None and field in file_info:
+        return file_info[field]
+    r = get_redis()
+    if r is not None:
+        return r.hget(f"fm:{translation_id}", field)
+    return None
+
+def _get_session_metadata(translation_id):
+    """Get translation metadata (user_id, engines, created_at) or None"""
+    metadata = translation_metadata.get(translation_id)
+    if metadata is not None:
+        return metadata
+    r = get_redis()
+    if r is not None:
+        raw = r.hgetall(f"meta:{translation_id}")
+        if raw:
+            if 'engines' in raw:
+                raw['engines'] = json.loads(raw['engines'])
+            return raw
+    return None
+
+# Janitor: in-memory sessions and their temp files are only removed on
+# explicit /delete-translation, so a long-lived server leaks memory and
+# disk. Sweep entries older than SESSION_TTL every 10 minutes; the
+# Redis copies expire on their own.
+SESSION_SWEEP_INTERVAL = 600
+
+def _sweep_sessions():
+    """Evict expired sessions and unlink their input/output files"""
+    cutoff = datetime.now().timestamp() - SESSION_TTL
+    for translation_id in list(translation_metadata.keys()):
+        metadata = translation_metadata.get(translation_id)
+        if metadata is None:
+            continue
+        try:
+            created = datetime.fromisoformat(metadata['created_at']).timestamp()
+        except (KeyError, ValueError):
+            created = 0.0
+        if created > cutoff:
+            continue
+
+        file_info = file_mappings.pop(translation_id, None)
+        translation_metadata.pop(translation_id, None)
+        with _status_queues_lock:
+            _status_queues.pop(translation_id, None)
+
+        if file_info:
+            paths = [file_info.get('input_path')]
+            paths.extend(trans.get('path')
+                         for trans in file_info.get('translations', {}).values())
+            for path in paths:
+                if not path:
+                    continue
+                try:
+                    os.unlink(path)
+                    log.info("Janitor removed expired file: %s", path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    log.warning("Janitor could not remove %s: %s", path, e)
+
+def _janitor_tick():
+    try:
+        _sweep_sessions()
+    except Exception as e:
+        log.error("Session janitor sweep failed: %s", e)
+    finally:
+        timer = threading.Timer(SESSION_SWEEP_INTERVAL, _janitor_tick)
+        timer.daemon = True
+        timer.start()
+
+_janitor_timer = threading.Timer(SESSION_SWEEP_INTERVAL, _janitor_tick)
+_janitor_timer.daemon = True
+_janitor_timer.start()
+
+def run_engine_translation(engine, input_path, output_path, translation_id, user_id, original_text_plain):
+    """
+    Translate a document with a single engine and record status/results
+
+    Runs either inside the Celery worker (when Redis is configured) or
+    in the in-process thread pool fallback. output_path is precomputed
+    by the caller so all engines share one path template.
+    """
+    _set_engine_status(translation_id, engine, 'translating')
+
+    available_engines = _engines()
+    if engine not in available_engines or not available_engines[engine]['available']:
+        if engine == 'indictrans2':
+            error_msg = "IndicTrans2 is not available. Please check the API connection."
+        else:
+            error_msg = f"Engine {engine} is not available. Please install required dependencies."
+        log.warning("%s", error_msg)
+        _set_engine_status(translation_id, engine, 'error')
+        _set_engine_result(translation_id, engine, {
+            'text': '',
+            'error': error_msg,
+            'filename': None
+        })
+        return
+
+    try:
+        # Reuse the shared translator for this engine
+        translator = get_translator(engine)
+
+        output_filename = os.path.basename(output_path)
+
+        # Translate the document
+        translator.translate_docx(
+            input_path,
+            output_path,
+            user_id=user_id,
+            translation_id=f"{translation_id}_{engine}"
+        )
 
-# Store file mappings (in production, use Redis or database)
-file_mappings = {}
+        # Extract translated text - one parse, both views
+        try:
+            paragraphs, tables = load_docx(output_path)
+            translated_text = render_html(paragraphs, tables)
+            translated_plain = render_plain(paragraphs, tables)
+        except Exception as extract_error:
+            log.warning("Could not extract text from %s: %s", output_path, extract_error)
+            translated_text = ""  # Use empty text if extraction fails
+            translated_plain = ""
+
+        # Store result BEFORE flipping status so pollers never see a
+        # completed engine without its translation
+        _set_engine_result(translation_id, engine, {
+            'path': output_path,
+            'filename': output_filename,
+            'text': translated_text
+        })
+        _set_engine_status(translation_id, engine, 'completed')
+        log.debug("[STATUS UPDATE] %s: completed for translation_id=%s", engine, translation_id)
+
+        # Log translation
+        log_translation(user_id, engine, original_text_plain, translated_plain, translation_id)
+
+    except Exception as e:
+        error_msg = str(e)
+        log.error("Error translating with %s: %s", engine, error_msg)
+        _set_engine_status(translation_id, engine, 'error')
+        _set_engine_result(translation_id, engine, {
+            'text': '',
+            'error': error_msg,
+            'filename': None
+        })
+
+if USE_CELERY:
+    # Same function, exposed as a Celery task. Dispatched to the
+    # 'indictrans2' queue for the GPU engine and 'translate' for the
+    # API-bound engines so GPU workers can live on dedicated nodes.
+    translate_engine_task = celery.task(name="app.translate_engine_task")(run_engine_translation)
 
-# Store translation metadata
-translation_metadata = {}  # translation_id -> {user_id, engine, etc.}
+# One translator per engine, shared process-wide. Constructing a
+# UnifiedDOCXTranslator per request re-pays engine setup cost on every
+# upload; the underlying engines keep their own model state behind
+# locks, so sharing instances is safe.
+_TRANSLATORS = {}
+_TRANSLATORS_LOCK = threading.Lock()
+
+def get_translator(engine):
+    """Get the shared UnifiedDOCXTranslator for an engine"""
+    with _TRANSLATORS_LOCK:
+        translator = _TRANSLATORS.get(engine)
+        if translator is None:
+            translator = UnifiedDOCXTranslator(engine=engine)
+            _TRANSLATORS[engine] = translator
+    return translator
+
+# Per-engine readiness, flipped by preload_models as each engine comes
+# up; /engines reports it so the frontend can show "loading..." instead
+# of failing against a not-yet-ready engine
+MODEL_READY = {}
 
 # Pre-load models on startup
 def preload_models():
@@ -63,16 +440,17 @@ def preload_models():
     print("Pre-loading translation models...")
     print("=" * 60)
     
-    available_engines = get_available_engines()
+    available_engines = _engines()
     
     # Load models in order: Gemini, Google Standard, Google Adaptive, IndicTrans2
     load_order = ['gemini-3-pro', 'google-standard', 'google-adaptive', 'indictrans2']
     
     for engine in load_order:
         if engine in available_engines and available_engines[engine]['available']:
+            MODEL_READY.setdefault(engine, False)
             try:
                 print(f"Loading {engine}...")
-                translator = UnifiedDOCXTranslator(engine=engine)
+                translator = get_translator(engine)
                 # For IndicTrans2, trigger model initialization and verify it's loaded on RTX 5090
                 if engine == 'indictrans2':
                     import torch
@@ -188,11 +566,12 @@ def preload_models():
                     print("=" * 60)
                 else:
                     print(f"✓ {engine} ready")
+                MODEL_READY[engine] = True
             except Exception as e:
                 print(f"✗ {engine} failed to load: {e}")
                 import traceback
                 traceback.print_exc()
-                # Re-raise the exception to stop server startup
+                # Re-raise the exception to stop the preload thread
                 raise
     
     print("=" * 60)
@@ -240,57 +619,159 @@ def logout():
 @app.route('/engines', methods=['GET'])
 def get_engines():
     """Get available translation engines"""
-    engines = get_available_engines()
+    engines = {}
+    for name, info in _engines().items():
+        engine_info = dict(info)
+        # Engines report ready=False while preload_models is still
+        # warming them in the background
+        engine_info['ready'] = MODEL_READY.get(name, True)
+        engines[name] = engine_info
     return jsonify({'success': True, 'engines': engines})
 
+@app.route('/engines/refresh', methods=['POST'])
+def refresh_engines():
+    """Re-probe engine availability (admin escape hatch)"""
+    _engines.cache_clear()
+    return jsonify({'success': True, 'engines': _engines()})
+
+# WordprocessingML namespace prefix used by document.xml
+_W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+def _docx_para_text(para_elem):
+    """Concatenate the w:t runs of a paragraph element"""
+    return ''.join(node.text or '' for node in para_elem.iter(_W_NS + 't'))
+
+def iter_docx_blocks(file_path):
+    """
+    Stream body-level blocks of a DOCX file without building a DOM
+
+    Yields ('p', text) for body paragraphs and ('tbl', grid) for tables,
+    where grid is a row-major list of cell-text lists. Reads
+    word/document.xml straight out of the ZIP with a pull parser and
+    clears each block after emitting it, so memory stays bounded no
+    matter how large the document is.
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        with archive.open('word/document.xml') as stream:
+            table_depth = 0
+            for event, elem in ET.iterparse(stream, events=('start', 'end')):
+                tag = elem.tag
+                if event == 'start':
+                    if tag == _W_NS + 'tbl':
+                        table_depth += 1
+                    continue
+                if tag == _W_NS + 'tbl':
+                    table_depth -= 1
+                    if table_depth == 0:
+                        grid = []
+                        for row in elem.findall(_W_NS + 'tr'):
+                            grid.append([
+                                ' '.join(
+                                    text for text in (
+                                        _docx_para_text(para)
+                                        for para in cell.findall(_W_NS + 'p')
+                                    ) if text.strip()
+                                )
+                                for cell in row.findall(_W_NS + 'tc')
+                            ])
+                        yield 'tbl', grid
+                        elem.clear()
+                elif tag == _W_NS + 'p' and table_depth == 0:
+                    yield 'p', _docx_para_text(elem)
+                    elem.clear()
+
+@lru_cache(maxsize=32)
+def _load_docx(file_path, mtime):
+    """
+    Parse a DOCX file once into plain Python structures
+
+    Returns (paragraphs, tables) where paragraphs is a list of non-empty
+    paragraph strings and tables is a list of row-major cell-text grids,
+    built from the streaming parser above. Cached on (path, mtime) so
+    repeated extractions of the same file - e.g. HTML preview plus plain
+    text for translation - reuse one parse, while edits to the file
+    invalidate the entry.
+    """
+    paragraphs = []
+    tables = []
+    for kind, value in iter_docx_blocks(file_path):
+        if kind == 'p':
+            if value.strip():
+                paragraphs.append(value)
+        else:
+            tables.append(value)
+    return paragraphs, tables
+
+def load_docx(file_path):
+    """Cached DOCX parse keyed by path + modification time"""
+    return _load_docx(file_path, os.path.getmtime(file_path))
+
+# Static markup fragments for render_html. Styles live in one <style>
+# block per response instead of being repeated inline on every cell -
+# for a 100x10 table that alone saves tens of KB of duplicate bytes.
+_TABLE_STYLE = ("<style>.tt{border-collapse:collapse;width:100%;margin:15px 0}"
+                ".tt th,.tt td{border:1px solid #ddd;padding:8px;text-align:left}</style>")
+_TABLE_OPEN = "<table class='tt'>"
+_TH_OPEN = "<th>"
+_TD_OPEN = "<td>"
+
+def render_html(paragraphs, tables):
+    """Render parsed DOCX content as HTML (preserves tables)"""
+    html_parts = []
+    if tables:
+        html_parts.append(_TABLE_STYLE)
+    for text in paragraphs:
+        html_parts.append(f"<p>{html.escape(text, quote=False)}</p>")
+    for table in tables:
+        html_parts.append(_TABLE_OPEN)
+        for row_idx, row in enumerate(table):
+            html_parts.append("<tr>")
+            # First row as header
+            cell_open, cell_close = (_TH_OPEN, "</th>") if row_idx == 0 else (_TD_OPEN, "</td>")
+            for cell_text in row:
+                html_parts.append(cell_open)
+                html_parts.append(html.escape(cell_text, quote=False))
+                html_parts.append(cell_close)
+            html_parts.append("</tr>")
+        html_parts.append("</table>")
+    return ''.join(html_parts)
+
+def _iter_plain(paragraphs, tables):
+    """Yield plain-text lines for paragraphs and table rows"""
+    yield from paragraphs
+    for table in tables:
+        for row in table:
+            row_line = ' | '.join(cell_text for cell_text in row if cell_text.strip())
+            if row_line:
+                yield row_line
+
+def render_plain(paragraphs, tables):
+    """Render parsed DOCX content as plain text (for translation)"""
+    return '\n\n'.join(_iter_plain(paragraphs, tables))
+
 def extract_text_from_docx(file_path, as_html=False):
     """Extract text content from DOCX file, optionally as HTML (preserves tables)"""
     try:
-        doc = Document(file_path)
+        paragraphs, tables = load_docx(file_path)
         if as_html:
-            # Extract as HTML to preserve tables and formatting
-            html_parts = []
-            
-            # Extract paragraphs
-            for para in doc.paragraphs:
-                if para.text.strip():
-                    html_parts.append(f"<p>{para.text}</p>")
-            
-            # Extract tables as HTML tables
-            for table in doc.tables:
-                html_parts.append("<table style='border-collapse: collapse; width: 100%; margin: 15px 0;'>")
-                for row_idx, row in enumerate(table.rows):
-                    html_parts.append("<tr>")
-                    for cell in row.cells:
-                        cell_text = ' '.join([p.text for p in cell.paragraphs if p.text.strip()])
-                        # First row as header
-                        tag = "th" if row_idx == 0 else "td"
-                        html_parts.append(f"<{tag} style='border: 1px solid #ddd; padding: 8px; text-align: left;'>{cell_text}</{tag}>")
-                    html_parts.append("</tr>")
-                html_parts.append("</table>")
-            
-            return '\n'.join(html_parts)
-        else:
-            # Plain text extraction (for translation)
-            paragraphs = []
-            for para in doc.paragraphs:
-                if para.text.strip():
-                    paragraphs.append(para.text)
-            # Also extract table text
-            for table in doc.tables:
-                for row in table.rows:
-                    row_texts = []
-                    for cell in row.cells:
-                        cell_text = ' '.join([p.text for p in cell.paragraphs if p.text.strip()])
-                        if cell_text.strip():
-                            row_texts.append(cell_text)
-                    if row_texts:
-                        paragraphs.append(' | '.join(row_texts))
-            return '\n\n'.join(paragraphs)
+            return render_html(paragraphs, tables)
+        return render_plain(paragraphs, tables)
     except Exception as e:
         print(f"Error extracting text: {e}")
         return ""
 
+def extract_texts_from_docx(file_path):
+    """Extract both HTML and plain-text views from one DOCX parse"""
+    try:
+        paragraphs, tables = load_docx(file_path)
+        return {
+            'html': render_html(paragraphs, tables),
+            'plain': render_plain(paragraphs, tables)
+        }
+    except Exception as e:
+        print(f"Error extracting text: {e}")
+        return {'html': '', 'plain': ''}
+
 @app.route('/translate', methods=['POST'])
 def translate_file():
     """Handle file upload and generate all 4 translations simultaneously"""
@@ -314,214 +795,82 @@ def translate_file():
         if not allowed_file(file.filename):
             return jsonify({'error': 'Invalid file type. Please upload a .docx file'}), 400
         
-        # Save uploaded file
+        # Save uploaded file with a large buffer (Werkzeug's default
+        # save() copies in 16 KiB chunks - thousands of syscalls for a
+        # 50 MB upload)
         filename = secure_filename(file.filename)
         input_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(input_path)
+        with open(input_path, 'wb', buffering=1 << 20) as f:
+            shutil.copyfileobj(file.stream, f, length=1 << 20)
         
         try:
-            # Extract original text for preview
-            original_text = extract_text_from_docx(input_path, as_html=True)  # Get HTML for display
-            original_text_plain = extract_text_from_docx(input_path, as_html=False)  # Plain text for translation
+            # Extract original text for preview - both views from one parse
+            texts = extract_texts_from_docx(input_path)
+            original_text = texts['html']  # HTML for display
+            original_text_plain = texts['plain']  # Plain text for translation
             
             # Generate translation ID
             translation_id = str(uuid.uuid4())
             input_file = Path(input_path)
             
             # Get available engines
-            available_engines = get_available_engines()
+            available_engines = _engines()
             # Order: Gemini first (fastest), then Google Standard, Google Adaptive, IndicTrans2 last (slowest)
             # Always include IndicTrans2 - it will handle errors gracefully
             engines_to_use = ['gemini-3-pro', 'google-standard', 'google-adaptive', 'indictrans2']
             
-            # Generate all translations (will be updated progressively)
-            translations = {}
-            translation_files = {}
-            
-            # Start translations in parallel but in order
-            import asyncio
-            import concurrent.futures
-            
-            def translate_with_engine(engine):
-                """Translate with a specific engine"""
-                # Check if engine is available
-                if engine not in available_engines or not available_engines[engine]['available']:
-                    error_msg = f'Engine {engine} is not available. Please install required dependencies.'
-                    print(f"Warning: {error_msg}")
-                    return engine, {
-                        'text': '',
-                        'error': error_msg,
-                        'filename': None
-                    }
-                
-                try:
-                    # Create translator for this engine
-                    translator = UnifiedDOCXTranslator(engine=engine)
-                    
-                    # Create output filename
-                    output_filename = f"{input_file.stem}_telugu_{engine}{input_file.suffix}"
-                    output_path = os.path.join(app.config['UPLOAD_FOLDER'], output_filename)
-                    
-                    # Translate the document
-                    translator.translate_docx(
-                        input_path, 
-                        output_path,
-                        user_id=user_id,
-                        translation_id=f"{translation_id}_{engine}"
-                    )
-                    
-                    # Extract translated text as HTML for display
-                    translated_text = extract_text_from_docx(output_path, as_html=True)
-                    
-                    result = {
-                        'text': translated_text,
-                        'filename': output_filename,
-                        'error': None
-                    }
-                    
-                    translation_files[engine] = {
-                        'path': output_path,
-                        'filename': output_filename
-                    }
-                    
-                    # Log translation
-                    log_translation(user_id, engine, original_text_plain, extract_text_from_docx(output_path, as_html=False), translation_id)
-                    
-                    return engine, result
-                    
-                except Exception as e:
-                    error_msg = str(e)
-                    print(f"Error translating with {engine}: {error_msg}")
-                    return engine, {
-                        'text': '',
-                        'error': error_msg,
-                        'filename': None
-                    }
-            
-            # Store initial state for progressive updates
-            file_mappings[translation_id] = {
-                'input_path': input_path,
-                'original_text': original_text,
-                'translations': {},
-                'status': {engine: 'pending' for engine in engines_to_use}
-            }
-            
-            translation_metadata[translation_id] = {
-                'user_id': user_id,
-                'engines': engines_to_use,
-                'created_at': datetime.now().isoformat()
+            # Precompute output paths once; cap the untrusted stem so
+            # the suffixed names stay within filesystem limits
+            upload_folder = app.config['UPLOAD_FOLDER']
+            stem = input_file.stem[:120]
+            out_paths = {
+                engine: os.path.join(upload_folder, f"{stem}_telugu_{engine}{input_file.suffix}")
+                for engine in engines_to_use
             }
             
-            # Start background translation with PARALLEL execution
-            #Author: github.com/faraz-wq
-    
-            import threading
-            import concurrent.futures
-            
-            def translate_single_engine(engine):
-                """Translate with a single engine"""
-                if translation_id not in file_mappings:
-                    return
-                
-                # Update status to translating
-                file_mappings[translation_id]['status'][engine] = 'translating'
-                
-                # Double-check engine is available (shouldn't happen if filtering worked)
-                if engine not in available_engines or not available_engines[engine]['available']:
-                    if engine == 'indictrans2':
-                        error_msg = "IndicTrans2 is not available. Please check the API connection."
-                    else:
-                        error_msg = f"Engine {engine} is not available. Please install required dependencies."
-                    print(f"Warning: {error_msg}")
-                    file_mappings[translation_id]['status'][engine] = 'error'
-                    file_mappings[translation_id]['translations'][engine] = {
-                        'text': '',
-                        'error': error_msg,
-                        'filename': None
-                    }
-                    return
-                
-                try:
-                    # Create translator for this engine
-                    translator = UnifiedDOCXTranslator(engine=engine)
-                    
-                    # Create output filename
-                    output_filename = f"{input_file.stem}_telugu_{engine}{input_file.suffix}"
-                    output_path = os.path.join(app.config['UPLOAD_FOLDER'], output_filename)
-                    
-                    # Translate the document
-                    translator.translate_docx(
-                        input_path, 
-                        output_path,
-                        user_id=user_id,
-                        translation_id=f"{translation_id}_{engine}"
+            # Store initial state for progressive updates
+            _init_session(translation_id, input_path, original_text,
+                          engines_to_use, user_id)
+
+            if USE_CELERY:
+                # Dispatch one task per engine; the GPU-bound IndicTrans2
+                # engine goes to its own queue
+                for engine in engines_to_use:
+                    translate_engine_task.apply_async(
+                        args=(engine, input_path, out_paths[engine], translation_id, user_id, original_text_plain),
+                        queue='indictrans2' if engine == 'indictrans2' else 'translate'
                     )
-                    
-                    # Extract translated text
-                    try:
-                        translated_text = extract_text_from_docx(output_path, as_html=True)
-                    except Exception as extract_error:
-                        print(f"Warning: Could not extract text from {output_path}: {extract_error}")
-                        translated_text = ""  # Use empty text if extraction fails
-                    
-                    # Store in file_mappings
-                    file_mappings[translation_id]['translations'][engine] = {
-                        'path': output_path,
-                        'filename': output_filename,
-                        'text': translated_text
-                    }
-                    
-                    # Update status - IMPORTANT: Set status AFTER storing translations
-                    # Use direct assignment to ensure it's set immediately
-                    if translation_id in file_mappings:
-                        file_mappings[translation_id]['status'][engine] = 'completed'
-                        
-                        # Verify it was set correctly
-                        actual_status = file_mappings[translation_id]['status'].get(engine)
-                        if actual_status != 'completed':
-                            print(f"[ERROR] Status not set correctly! Expected 'completed', got '{actual_status}'")
-                        else:
-                            print(f"[STATUS UPDATE] ✓ {engine}: status set to 'completed' for translation_id={translation_id}")
-                            print(f"[STATUS DEBUG] Full status dict: {dict(file_mappings[translation_id]['status'])}")
-                            print(f"[STATUS DEBUG] Has translations entry: {engine in file_mappings[translation_id].get('translations', {})}")
-                    else:
-                        print(f"[ERROR] translation_id {translation_id} not found in file_mappings when trying to set status!")
-                    
-                    # Log translation
-                    log_translation(user_id, engine, original_text_plain, extract_text_from_docx(output_path, as_html=False), translation_id)
-                    
-                except Exception as e:
-                    error_msg = str(e)
-                    print(f"Error translating with {engine}: {error_msg}")
-                    file_mappings[translation_id]['status'][engine] = 'error'
-                    file_mappings[translation_id]['translations'][engine] = {
-                        'text': '',
-                        'error': error_msg,
-                        'filename': None
-                    }
-            
-            def translate_all_parallel():
-                """Translate with all engines in PARALLEL using ThreadPoolExecutor"""
-                # Use ThreadPoolExecutor to run all engines in parallel
-                # No timeout - let IndicTrans2 take as long as it needs
-                with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-                    # Submit all translation tasks in parallel
-                    futures = {executor.submit(translate_single_engine, engine): engine 
-                              for engine in engines_to_use}
-                    
-                    # Wait for all to complete (they run in parallel) - no timeout
-                    for future in concurrent.futures.as_completed(futures):
-                        engine = futures[future]
-                        try:
-                            future.result()  # Get result (or raise exception)
-                        except Exception as e:
-                            print(f"Translation task for {engine} raised exception: {e}")
-            
-            # Start parallel translation in background thread
-            thread = threading.Thread(target=translate_all_parallel)
-            thread.daemon = True
-            thread.start()
-            
+            else:
+                # Fallback: run all engines in parallel in-process.
+                # Process-level (GIL-free) parallelism for the CPU-bound
+                # parts comes from the Celery path above, whose workers
+                # are separate processes; a ProcessPoolExecutor here
+                # would break the in-memory session store and re-load
+                # the IndicTrans2 checkpoint per process. Threads are
+                # fine for this path: the API engines are IO-bound and
+                # IndicTrans2 releases the GIL inside CUDA kernels.
+                #Author: github.com/faraz-wq
+                def translate_all_parallel():
+                    """Translate with all engines in PARALLEL using ThreadPoolExecutor"""
+                    # No timeout - let IndicTrans2 take as long as it needs
+                    with concurrent.futures.ThreadPoolExecutor(max_workers=len(engines_to_use)) as executor:
+                        futures = {executor.submit(run_engine_translation, engine, input_path,
+                                                   out_paths[engine], translation_id, user_id,
+                                                   original_text_plain): engine
+                                  for engine in engines_to_use}
+
+                        # Wait for all to complete (they run in parallel) - no timeout
+                        for future in concurrent.futures.as_completed(futures):
+                            engine = futures[future]
+                            try:
+                                future.result()  # Get result (or raise exception)
+                            except Exception as e:
+                                log.error("Translation task for %s raised exception: %s", engine, e)
+
+                thread = threading.Thread(target=translate_all_parallel)
+                thread.daemon = True
+                thread.start()
+
             # Return immediately with original text and translation ID
             # Frontend will poll for status updates
             return jsonify({
@@ -548,24 +897,23 @@ def translate_file():
 def get_translation_status(translation_id):
     """Get status of translations - returns completed translations"""
     try:
-        if translation_id not in file_mappings:
+        status, session_translations = _get_session_state(translation_id)
+        if status is None:
             return jsonify({'error': 'Translation session not found'}), 404
         
-        file_info = file_mappings[translation_id]
         translations = {}
-        status = file_info.get('status', {})
         
-        # Debug: Print what we're returning
-        print(f"[STATUS ENDPOINT] translation_id={translation_id}, status dict: {status}")
+        log.debug("[STATUS ENDPOINT] translation_id=%s, status dict: %s", translation_id, status)
         
         # Build translations object with current status
         # IMPORTANT: Check status first, then translations
-        for engine in file_info.get('status', {}).keys():
+        for engine in status.keys():
             current_status = status.get(engine, 'pending')
-            print(f"[STATUS ENDPOINT] {engine}: status={current_status}, has_translation={engine in file_info.get('translations', {})}")
+            log.debug("[STATUS ENDPOINT] %s: status=%s, has_translation=%s",
+                      engine, current_status, engine in session_translations)
             
-            if engine in file_info.get('translations', {}):
-                trans_data = file_info['translations'][engine]
+            if engine in session_translations:
+                trans_data = session_translations[engine]
                 translations[engine] = {
                     'text': trans_data.get('text', ''),
                     'filename': trans_data.get('filename'),
@@ -591,21 +939,81 @@ def get_translation_status(translation_id):
             'all_complete': all_complete
         }
         
-        # Debug: Print what we're sending (without full text to avoid clutter)
-        debug_data = {
-            'success': response_data['success'],
-            'status': response_data['status'],
-            'all_complete': response_data['all_complete'],
-            'translations': {k: {'has_text': bool(v.get('text')), 'status': v.get('status'), 'filename': v.get('filename')} for k, v in response_data['translations'].items()}
-        }
-        print(f"[STATUS ENDPOINT] Returning response for {translation_id}:")
-        print(json.dumps(debug_data, indent=2))
-        
         return jsonify(response_data)
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/translate-stream/<translation_id>', methods=['GET'])
+def translate_stream(translation_id):
+    """
+    Stream translation status updates over Server-Sent Events
+
+    Pushes an event whenever an engine changes status instead of making
+    the frontend poll /translate-status in a loop. Each event carries
+    the full status dict; the stream ends once every engine is done.
+    """
+    initial_status, _ = _get_session_state(translation_id)
+    if initial_status is None:
+        return jsonify({'error': 'Translation session not found'}), 404
+
+    def generate():
+        listener = queue.Queue()
+        with _status_queues_lock:
+            _status_queues.setdefault(translation_id, []).append(listener)
+
+        pubsub = None
+        r = get_redis()
+        if r is not None:
+            # Bridge status events published by Celery workers into the
+            # local listener queue
+            pubsub = r.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(f"fm:{translation_id}:events")
+
+            def pump():
+                for message in pubsub.listen():
+                    try:
+                        listener.put(json.loads(message['data']))
+                    except (ValueError, TypeError, KeyError):
+                        continue
+
+            threading.Thread(target=pump, daemon=True).start()
+
+        try:
+            # Send the current snapshot first so late subscribers catch up
+            status, _ = _get_session_state(translation_id)
+            yield f"data: {json.dumps({'status': status})}\n\n"
+            if status and all(s in ('completed', 'error') for s in status.values()):
+                return
+
+            while True:
+                try:
+                    event = listener.get(timeout=30)
+                except queue.Empty:
+                    # Keep intermediaries from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    continue
+
+                status, _ = _get_session_state(translation_id)
+                yield f"data: {json.dumps({'event': event, 'status': status})}\n\n"
+
+                if status and all(s in ('completed', 'error') for s in status.values()):
+                    return
+        finally:
+            with _status_queues_lock:
+                listeners = _status_queues.get(translation_id)
+                if listeners is not None:
+                    try:
+                        listeners.remove(listener)
+                    except ValueError:
+                        pass
+                    if not listeners:
+                        del _status_queues[translation_id]
+            if pubsub is not None:
+                pubsub.close()
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream')
+
 @app.route('/download', methods=['POST'])
 def download_file():
     """Download a specific translated file"""
@@ -614,24 +1022,23 @@ def download_file():
         translation_id = data.get('translation_id')
         engine = data.get('engine')
         
-        if not translation_id or translation_id not in file_mappings:
+        status, session_translations = _get_session_state(translation_id)
+        if not translation_id or status is None:
             return jsonify({'error': 'Translation session not found'}), 404
         
-        file_info = file_mappings[translation_id]
-        
         if engine:
             # Download specific engine translation
-            if 'translations' in file_info and engine in file_info['translations']:
-                output_path = file_info['translations'][engine]['path']
-                output_filename = file_info['translations'][engine]['filename']
+            if engine in session_translations and session_translations[engine].get('path'):
+                output_path = session_translations[engine]['path']
+                output_filename = session_translations[engine]['filename']
             else:
                 return jsonify({'error': 'Translation file not found'}), 404
         else:
             # Download first available translation
-            if 'translations' in file_info and file_info['translations']:
-                first_engine = list(file_info['translations'].keys())[0]
-                output_path = file_info['translations'][first_engine]['path']
-                output_filename = file_info['translations'][first_engine]['filename']
+            if session_translations:
+                first_engine = list(session_translations.keys())[0]
+                output_path = session_translations[first_engine].get('path')
+                output_filename = session_translations[first_engine]['filename']
             else:
                 return jsonify({'error': 'No translation files found'}), 404
         
@@ -655,24 +1062,28 @@ def delete_translation():
         translation_id = data.get('translation_id')
         engine = data.get('engine')
         
-        if not translation_id or translation_id not in file_mappings:
+        status, session_translations = _get_session_state(translation_id)
+        if not translation_id or status is None:
             return jsonify({'error': 'Translation session not found'}), 404
         
         if not engine:
             return jsonify({'error': 'Engine name required'}), 400
         
-        file_info = file_mappings[translation_id]
-        
-        if 'translations' in file_info and engine in file_info['translations']:
-            file_path = file_info['translations'][engine]['path']
+        if engine in session_translations and session_translations[engine].get('path'):
+            file_path = session_translations[engine]['path']
             
             # Delete file
             if os.path.exists(file_path):
                 os.remove(file_path)
-                print(f"Deleted translation file: {file_path}")
+                log.info("Deleted translation file: %s", file_path)
             
             # Remove from mappings
-            del file_info['translations'][engine]
+            file_info = file_mappings.get(translation_id)
+            if file_info is not None:
+                file_info['translations'].pop(engine, None)
+            r = get_redis()
+            if r is not None:
+                r.hdel(f"fm:{translation_id}:trans", engine)
             
             return jsonify({'success': True, 'message': f'Translation {engine} deleted'})
         else:
@@ -708,7 +1119,6 @@ def create_comment():
             return jsonify({'error': 'Missing required fields'}), 400
         
         if HAS_SUPABASE:
-            from supabase_config import save_comment
             result = save_comment(comment_data)
             if result.get('success'):
                 return jsonify({'success': True, 'comment': result.get('data')})
@@ -739,8 +1149,7 @@ def get_comments():
         
         try:
             if HAS_SUPABASE:
-                from supabase_config import get_comments
-                result = get_comments(translation_id, engine=engine)
+                result = sb_get_comments(translation_id, engine=engine)
                 if result.get('success'):
                     return jsonify({'success': True, 'comments': result.get('data', [])})
                 else:
@@ -772,8 +1181,7 @@ def delete_comment(comment_id):
     """Delete a comment"""
     try:
         if HAS_SUPABASE:
-            from supabase_config import delete_comment
-            result = delete_comment(comment_id)
+            result = sb_delete_comment(comment_id)
             if result.get('success'):
                 return jsonify({'success': True})
             else:
@@ -795,26 +1203,24 @@ def save_edited_translation():
         if not edited_text:
             return jsonify({'error': 'No text provided'}), 400
         
-        if not translation_id or translation_id not in file_mappings:
+        if not translation_id:
             return jsonify({'error': 'Translation session not found'}), 400
         
-        output_path = file_mappings[translation_id]['output_path']
+        output_path = _get_session_field(translation_id, 'output_path')
+        if output_path is None:
+            return jsonify({'error': 'Translation session not found'}), 400
         
-        # Update the DOCX file with edited text
+        # Update the DOCX file with edited text: drop the existing
+        # body-level paragraphs in one XML pass (tables and section
+        # properties stay untouched), then bulk-append the edited ones
         doc = Document(output_path)
-        paragraphs = edited_text.split('\n\n')
+        body = doc.element.body
+        for p_elem in body.findall(qn('w:p')):
+            body.remove(p_elem)
         
-        # Clear existing paragraphs (except first which might be title)
-        for para in doc.paragraphs:
-            para.clear()
-        
-        # Add edited paragraphs
-        for i, para_text in enumerate(paragraphs):
+        for para_text in edited_text.split('\n\n'):
             if para_text.strip():
-                if i < len(doc.paragraphs):
-                    doc.paragraphs[i].text = para_text
-                else:
-                    doc.add_paragraph(para_text)
+                doc.add_paragraph(para_text)
         
         doc.save(output_path)
         
@@ -834,8 +1240,9 @@ def submit_feedback():
         
         # Get translation model from metadata
         translation_model = 'indictrans2'  # default
-        if translation_id and translation_id in translation_metadata:
-            translation_model = translation_metadata[translation_id].get('engine', 'indictrans2')
+        metadata = _get_session_metadata(translation_id) if translation_id else None
+        if metadata is not None:
+            translation_model = metadata.get('engine', 'indictrans2')
         else:
             translation_model = data.get('translation_model', 'indictrans2')
         
@@ -851,20 +1258,16 @@ def submit_feedback():
             'preview_features': data.get('preview_features'),
             'suggestions': data.get('suggestions', ''),
             'thumbs_rating': data.get('thumbs_rating'),  # Add thumbs rating support
-            'criteria_ratings': criteria_ratings if criteria_ratings else None,  # Store criteria ratings as JSON
-            'created_at': datetime.now().isoformat()
+            'criteria_ratings': criteria_ratings if criteria_ratings else None  # Store criteria ratings as JSON
+            # created_at is populated by the column's DEFAULT NOW()
         }
         
-        # Only submit if at least one field has a value
-        if any([
-            feedback_data['file_type'],
-            feedback_data['overall_quality'] is not None,
-            feedback_data['structure_preservation'] is not None,
-            feedback_data['preview_features'] is not None,
-            feedback_data['suggestions'],
-            feedback_data['thumbs_rating'],  # Include thumbs rating
-            criteria_ratings  # Include criteria ratings
-        ]):
+        # Only submit if at least one field has a value; generator form
+        # short-circuits without building an intermediate list
+        if any(feedback_data[key] not in (None, '')
+               for key in ('file_type', 'overall_quality', 'structure_preservation',
+                           'preview_features', 'suggestions', 'thumbs_rating',
+                           'criteria_ratings')):
             # Log feedback with user_id and translation_model
             if user_id:
                 result = log_feedback(user_id, translation_id, translation_model, feedback_data)
@@ -910,7 +1313,6 @@ def get_feedback():
             return jsonify({'error': 'translation_id required'}), 400
         
         if HAS_SUPABASE:
-            from supabase_config import get_supabase_client
             supabase = get_supabase_client()
             if supabase:
                 query = supabase.table("feedback").select("*").eq("translation_id", translation_id)
@@ -943,34 +1345,49 @@ def get_translation_history():
     try:
         user_id = session.get('user_id') or request.args.get('user_id')
         if not user_id:
-            print("[HISTORY] No user_id found in session or request")
+            log.debug("[HISTORY] No user_id found in session or request")
             return jsonify({'error': 'Authentication required'}), 401
         
-        print(f"[HISTORY] Fetching history for user_id: {user_id}")
+        log.debug("[HISTORY] Fetching history for user_id: %s", user_id)
         
         if HAS_SUPABASE:
-            from supabase_config import get_supabase_client
             supabase = get_supabase_client()
             if supabase:
+                # Prefer the server-side RPC (see supabase_history_rpc.sql):
+                # Postgres does the grouping and returns pre-shaped session
+                # JSON in one roundtrip. Fall back to client-side grouping
+                # when the function is not installed.
+                try:
+                    rpc_response = supabase.rpc('get_user_history', {'uid': user_id}).execute()
+                    if rpc_response.data is not None:
+                        log.debug("[HISTORY] Returning %d history sessions (RPC)", len(rpc_response.data))
+                        return jsonify({'success': True, 'history': rpc_response.data})
+                except Exception as e:
+                    log.debug("[HISTORY] get_user_history RPC unavailable, falling back: %s", e)
+                
                 # Get all translations for this user, grouped by translation_id
-                print(f"[HISTORY] Querying translation_logs for user_id: {user_id}")
-                translations_response = supabase.table("translation_logs").select("*").eq("user_id", user_id).order("created_at", desc=True).execute()
+                log.debug("[HISTORY] Querying translation_logs for user_id: %s", user_id)
+                # Fetch only the columns the grouping uses - '*' also
+                # dragged file metadata and duplicate user columns along
+                translations_response = supabase.table("translation_logs").select(
+                    "id,translation_id,translation_model,source_text,translated_text,created_at"
+                ).eq("user_id", user_id).order("created_at", desc=True).execute()
                 
-                print(f"[HISTORY] Found {len(translations_response.data)} translation log entries")
+                log.debug("[HISTORY] Found %d translation log entries", len(translations_response.data))
                 
                 # Group translations by translation_id
                 translation_sessions = {}
                 translations_without_id = []
                 for trans in translations_response.data:
-                    trans_id = trans.get('translation_id')
-                    # Handle None, empty string, or missing translation_id
-                    if not trans_id or trans_id.strip() == '':
+                    # Strip once; None/empty/whitespace ids all fail the
+                    # truthiness check
+                    trans_id = (trans.get('translation_id') or '').strip()
+                    if not trans_id:
                         translations_without_id.append(trans.get('id'))
-                        print(f"[HISTORY] Skipping translation without translation_id: id={trans.get('id')}, model={trans.get('translation_model')}")
+                        log.debug("[HISTORY] Skipping translation without translation_id: id=%s, model=%s",
+                                  trans.get('id'), trans.get('translation_model'))
                         continue
                     
-                    trans_id = trans_id.strip()  # Clean whitespace
-                    
                     if trans_id not in translation_sessions:
                         translation_sessions[trans_id] = {
                             'translation_id': trans_id,
@@ -988,72 +1405,89 @@ def get_translation_history():
                         'created_at': trans.get('created_at')
                     }
                 
-                print(f"[HISTORY] Grouped into {len(translation_sessions)} translation sessions")
+                log.debug("[HISTORY] Grouped into %d translation sessions", len(translation_sessions))
                 if translations_without_id:
-                    print(f"[HISTORY] Warning: {len(translations_without_id)} translations were skipped due to missing translation_id")
+                    log.debug("[HISTORY] %d translations skipped due to missing translation_id", len(translations_without_id))
                 
-                # Get feedback for each translation_id
-                for trans_id in translation_sessions.keys():
-                    try:
-                        feedback_response = supabase.table("feedback").select("*").eq("translation_id", trans_id).eq("user_id", user_id).order("created_at", desc=True).execute()
-                        print(f"[HISTORY] Found {len(feedback_response.data)} feedback entries for translation_id: {trans_id}")
-                        
-                        # Use a dict to track the most recent feedback per engine
-                        engine_feedback_map = {}
-                        for feedback in feedback_response.data:
-                            # Prioritize translation_method as it has the correct engine name
-                            engine = feedback.get('translation_method') or feedback.get('translation_model')
-                            print(f"[HISTORY] Processing feedback entry - translation_model: {feedback.get('translation_model')}, translation_method: {feedback.get('translation_method')}, engine: {engine}, has_criteria_ratings: {bool(feedback.get('criteria_ratings'))}")
-                            if engine:
-                                # Only keep the first (most recent) feedback for each engine
-                                # Since we order by created_at desc, first occurrence is most recent
-                                if engine not in engine_feedback_map:
-                                    engine_feedback_map[engine] = {
-                                        'overall_quality': feedback.get('overall_quality'),
-                                        'structure_preservation': feedback.get('structure_preservation'),
-                                        'preview_features': feedback.get('preview_features'),
-                                        'thumbs_rating': feedback.get('thumbs_rating'),
-                                        'criteria_ratings': feedback.get('criteria_ratings'),
-                                        'suggestions': feedback.get('suggestions'),
-                                        'created_at': feedback.get('created_at')
-                                    }
-                                    print(f"[HISTORY] Added feedback for engine: {engine}")
+                # Bulk-fetch feedback and comments for every session in
+                # two queries instead of two roundtrips per session; the
+                # two queries are independent, so overlap their RTTs
+                session_ids = list(translation_sessions.keys())
+                feedback_by_id = defaultdict(list)
+                comments_by_id = defaultdict(list)
+                
+                def _fetch_feedback():
+                    return supabase.table("feedback").select(
+                        "translation_id,translation_method,translation_model,overall_quality,"
+                        "structure_preservation,preview_features,thumbs_rating,criteria_ratings,"
+                        "suggestions,created_at"
+                    ).in_("translation_id", session_ids).eq("user_id", user_id).order("created_at", desc=True).execute()
+                
+                def _fetch_comments():
+                    return supabase.table("comments").select("*").in_("translation_id", session_ids).order("created_at", desc=True).execute()
+                
+                if session_ids:
+                    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+                        feedback_future = executor.submit(_fetch_feedback)
+                        comments_future = executor.submit(_fetch_comments)
                         
-                        print(f"[HISTORY] Collected feedback for {len(engine_feedback_map)} engines: {list(engine_feedback_map.keys())}")
+                        try:
+                            feedback_response = feedback_future.result()
+                            log.debug("[HISTORY] Found %d feedback entries across %d sessions", len(feedback_response.data), len(session_ids))
+                            for feedback in feedback_response.data:
+                                feedback_by_id[feedback.get('translation_id')].append(feedback)
+                        except Exception as e:
+                            log.error("[HISTORY] Error fetching feedback: %s", e)
                         
-                        # Add all collected feedback to the session
-                        for engine, feedback_data in engine_feedback_map.items():
-                            translation_sessions[trans_id]['feedback'][engine] = feedback_data
-                    except Exception as e:
-                        print(f"[HISTORY] Error fetching feedback for {trans_id}: {e}")
+                        try:
+                            comments_response = comments_future.result()
+                            for comment in (comments_response.data or []):
+                                comments_by_id[comment.get('translation_id')].append(comment)
+                        except Exception as e:
+                            log.error("[HISTORY] Error fetching comments: %s", e)
+                
+                for trans_id, session_data in translation_sessions.items():
+                    # Use a dict to track the most recent feedback per engine
+                    engine_feedback_map = {}
+                    for feedback in feedback_by_id.get(trans_id, []):
+                        # Prioritize translation_method as it has the correct engine name
+                        engine = feedback.get('translation_method') or feedback.get('translation_model')
+                        if engine:
+                            # Only keep the first (most recent) feedback for each engine
+                            # Since we order by created_at desc, first occurrence is most recent
+                            if engine not in engine_feedback_map:
+                                engine_feedback_map[engine] = {
+                                    'overall_quality': feedback.get('overall_quality'),
+                                    'structure_preservation': feedback.get('structure_preservation'),
+                                    'preview_features': feedback.get('preview_features'),
+                                    'thumbs_rating': feedback.get('thumbs_rating'),
+                                    'criteria_ratings': feedback.get('criteria_ratings'),
+                                    'suggestions': feedback.get('suggestions'),
+                                    'created_at': feedback.get('created_at')
+                                }
                     
-                    # Get comments for this translation
-                    try:
-                        comments_response = supabase.table("comments").select("*").eq("translation_id", trans_id).order("created_at", desc=True).execute()
-                        translation_sessions[trans_id]['comments'] = comments_response.data if comments_response.data else []
-                    except Exception as e:
-                        print(f"[HISTORY] Error fetching comments for {trans_id}: {e}")
-                        translation_sessions[trans_id]['comments'] = []
+                    session_data['feedback'] = engine_feedback_map
+                    session_data['comments'] = comments_by_id.get(trans_id, [])
                 
                 # Convert to list sorted by date
                 history_list = list(translation_sessions.values())
                 history_list.sort(key=lambda x: x.get('created_at', ''), reverse=True)
                 
-                print(f"[HISTORY] Returning {len(history_list)} history sessions")
+                log.debug("[HISTORY] Returning %d history sessions", len(history_list))
                 return jsonify({
                     'success': True,
                     'history': history_list
                 })
             else:
-                print("[HISTORY] Supabase client is None")
+                log.debug("[HISTORY] Supabase client is None")
                 return jsonify({'success': True, 'history': [], 'message': 'Supabase not configured'})
         else:
-            print("[HISTORY] HAS_SUPABASE is False")
+            log.debug("[HISTORY] HAS_SUPABASE is False")
             # If Supabase not available, return empty history
             return jsonify({'success': True, 'history': [], 'message': 'Supabase not available'})
     
     except Exception as e:
-        print(f"[HISTORY] Error getting translation history: {e}")
+        log.error("[HISTORY] Error getting translation history: %s", e)
         import traceback
         traceback.print_exc()
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -1063,33 +1497,22 @@ def health():
     """Health check endpoint"""
     return jsonify({'status': 'ok', 'service': 'DOCX Translation Service'})
 
+# Under gunicorn there is no __main__ block, so allow warmup to be
+# requested at import time (once per worker) via PRELOAD_MODELS=1
+if os.getenv('PRELOAD_MODELS', '').lower() in ('1', 'true', 'yes'):
+    threading.Thread(target=preload_models, daemon=True, name='model-preload').start()
+
 if __name__ == '__main__':
     # Print startup message
     print("=" * 60)
     print("DOCX Translation Web Service")
     print("=" * 60)
     
-    # CRITICAL: Load all models BEFORE starting the server
-    # If model loading fails, the server will not start
-    try:
-        print("Loading translation models (this may take a few minutes)...")
-        preload_models()
-        print("=" * 60)
-        print("All models loaded successfully!")
-        print("=" * 60)
-    except Exception as e:
-        print("=" * 60)
-        print("FATAL ERROR: Failed to load translation models")
-        print("=" * 60)
-        print(f"Error: {e}")
-        import traceback
-        traceback.print_exc()
-        print("=" * 60)
-        print("Server will NOT start. Please fix the model loading issue and try again.")
-        print("=" * 60)
-        exit(1)
+    # Warm models in the background so the server (and /health) come up
+    # immediately; /engines exposes per-engine readiness while loading
+    print("Loading translation models in the background...")
+    threading.Thread(target=preload_models, daemon=True, name='model-preload').start()
     
-    # Only start server if models loaded successfully
     print("Starting server...")
     print("Access the web interface at: http://localhost:5000")
     print("=" * 60)
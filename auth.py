@@ -3,6 +3,17 @@ Hard-coded Authentication System
 Maps users to unique internal IDs
 """
 
+import hashlib
+import hmac
+import os
+
+# Key for the blake2b password hashes; override in production
+_AUTH_KEY = os.getenv("AUTH_HASH_KEY", "context-translation").encode()[:64]
+
+def _hash_password(password):
+    """Keyed blake2b digest of a password"""
+    return hashlib.blake2b(password.encode(), key=_AUTH_KEY).digest()
+
 # Hard-coded user database
 # Format: username -> (password, user_id)
 USERS = {
@@ -55,9 +66,11 @@ def authenticate(username, password):
     if username not in USERS:
         return False, None, "Invalid username"
     
-    stored_password, user_id = USERS[username]
+    stored_hash, user_id = _USER_HASHES[username]
     
-    if password != stored_password:
+    # Constant-time compare of keyed hashes - no plaintext comparison,
+    # no early-exit timing side channel
+    if not hmac.compare_digest(_hash_password(password), stored_hash):
         return False, None, "Invalid password"
     
     return True, user_id, None
@@ -76,7 +89,17 @@ def get_user_id(username):
         return USERS[username][1]
     return None
 
+# Hash passwords once at import; authenticate only ever touches digests
+_USER_HASHES = {
+    username: (_hash_password(password), user_id)
+    for username, (password, user_id) in USERS.items()
+}
+
+# Precomputed id set: is_valid_user_id runs on authenticated requests,
+# so keep it an O(1) hash lookup instead of scanning USERS
+_USER_IDS = frozenset(uid for _, uid in USERS.values())
+
 def is_valid_user_id(user_id):
     """Check if user_id exists"""
-    return any(uid == user_id for _, (_, uid) in USERS.items())
+    return user_id in _USER_IDS
 
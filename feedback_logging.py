@@ -3,7 +3,9 @@ Feedback and Translation Logging Module
 Logs all translations and feedback to Supabase
 """
 
-from datetime import datetime
+import atexit
+import queue
+import threading
 try:
     from supabase_config import get_supabase_client
     HAS_SUPABASE = True
@@ -11,6 +13,58 @@ except ImportError:
     HAS_SUPABASE = False
     print("Warning: Supabase not configured. Logging will not work.")
 
+# Feedback rows are queued and flushed in batches by a background
+# thread, so the request handler never blocks on a Supabase roundtrip
+# and TLS/HTTP overhead is amortized across rows
+_FLUSH_BATCH = 100
+_FLUSH_IDLE = 0.2  # seconds to wait for more rows before flushing
+
+_feedback_queue = queue.Queue()
+_flusher_lock = threading.Lock()
+_flusher_started = False
+
+def _flush_feedback_batch(batch):
+    """Insert a batch of feedback rows in one Supabase call"""
+    try:
+        supabase = get_supabase_client()
+        if not supabase:
+            return
+        supabase.table("feedback").insert(batch).execute()
+    except Exception as e:
+        print(f"Error flushing feedback batch of {len(batch)}: {e}")
+
+def _feedback_flusher():
+    while True:
+        batch = [_feedback_queue.get()]
+        try:
+            while len(batch) < _FLUSH_BATCH:
+                batch.append(_feedback_queue.get(timeout=_FLUSH_IDLE))
+        except queue.Empty:
+            pass
+        _flush_feedback_batch(batch)
+
+def _drain_feedback_queue():
+    """Flush whatever is still queued at interpreter shutdown"""
+    batch = []
+    while True:
+        try:
+            batch.append(_feedback_queue.get_nowait())
+        except queue.Empty:
+            break
+    if batch:
+        _flush_feedback_batch(batch)
+
+def _ensure_flusher():
+    global _flusher_started
+    if _flusher_started:
+        return
+    with _flusher_lock:
+        if not _flusher_started:
+            threading.Thread(target=_feedback_flusher, daemon=True,
+                             name='feedback-flush').start()
+            atexit.register(_drain_feedback_queue)
+            _flusher_started = True
+
 def log_translation(user_id, translation_model, source_text, translated_text, translation_id=None):
     """
     Log translation to Supabase
@@ -37,10 +91,12 @@ def log_translation(user_id, translation_model, source_text, translated_text, tr
         translation_log = {
             "user_id": user_id,
             "translation_model": translation_model,
-            "source_text": source_text[:5000],  # Limit length
-            "translated_text": translated_text[:5000],  # Limit length
-            "translation_id": translation_id,
-            "created_at": datetime.now().isoformat()
+            # Slice only when over the limit - short texts (the common
+            # case) skip the copy entirely
+            "source_text": source_text if len(source_text) <= 5000 else source_text[:5000],
+            "translated_text": translated_text if len(translated_text) <= 5000 else translated_text[:5000],
+            "translation_id": translation_id
+            # created_at comes from the column's DEFAULT NOW()
         }
         
         response = supabase.table("translation_logs").insert(translation_log).execute()
@@ -72,10 +128,6 @@ def log_feedback(user_id, translation_id, translation_model, feedback_data):
         return {"success": False, "error": "Supabase not configured. Please install supabase library to save feedback."}
     
     try:
-        supabase = get_supabase_client()
-        if not supabase:
-            return {"success": False, "error": "Supabase not configured"}
-        
         feedback_log = {
             "user_id": user_id,
             "translation_id": translation_id,
@@ -88,12 +140,15 @@ def log_feedback(user_id, translation_id, translation_model, feedback_data):
             "preview_features": feedback_data.get("preview_features"),
             "suggestions": feedback_data.get("suggestions", ""),
             "thumbs_rating": feedback_data.get("thumbs_rating"),
-            "criteria_ratings": feedback_data.get("criteria_ratings"),  # Store as JSON
-            "created_at": datetime.now().isoformat()
+            "criteria_ratings": feedback_data.get("criteria_ratings")  # Store as JSON
+            # created_at comes from the column's DEFAULT NOW()
         }
         
-        response = supabase.table("feedback").insert(feedback_log).execute()
-        return {"success": True, "data": response.data}
+        # Enqueue for the background flusher; the insert happens off
+        # the request path, batched with any neighbouring rows
+        _ensure_flusher()
+        _feedback_queue.put(feedback_log)
+        return {"success": True}
         
     except Exception as e:
         print(f"Error logging feedback: {e}")
@@ -4,10 +4,19 @@ Strictly applies glossary terms to text with override mode
 """
 
 import csv
+import hashlib
 import re
 from collections import OrderedDict
+from functools import lru_cache
 import os
 
+# Characters trimmed from CSV cells in one pass (whitespace + stray quotes)
+_STRIP_CHARS = ' \t\r\n"'
+
+# Only cache glossary results for short strings (repeated table cells,
+# sentence fragments) - long texts rarely repeat and would crowd the cache
+_CACHE_MAX_LEN = 512
+
 class GlossaryLoader:
     """Load and manage glossary for domain-specific translations"""
     
@@ -19,6 +28,10 @@ class GlossaryLoader:
             glossary_path: Path to glossary CSV file
         """
         self.glossary = OrderedDict()
+        self._pattern = None
+        self._lookup = {}
+        self._apply_cached = None
+        self.version_hash = "empty"
         self.load_glossary(glossary_path)
     
     def load_glossary(self, glossary_path):
@@ -30,39 +43,87 @@ class GlossaryLoader:
         try:
             with open(glossary_path, 'r', encoding='utf-8') as f:
                 reader = csv.reader(f, quotechar='"', skipinitialspace=True)
-                for row_num, row in enumerate(reader, 1):
-                    if len(row) >= 2:
-                        english = row[0].strip().strip('"')
-                        telugu = row[1].strip().strip('"')
-                        
-                        # Skip empty entries
-                        if not english or not telugu:
-                            continue
-                        
-                        # Store original case
+                for row in reader:
+                    if len(row) < 2:
+                        continue
+                    # One strip per cell covers whitespace and stray quotes
+                    english = row[0].strip(_STRIP_CHARS)
+                    telugu = row[1].strip(_STRIP_CHARS)
+                    
+                    # Skip empty entries; matching is case-insensitive
+                    # via the compiled pattern, so no case duplicates
+                    if english and telugu:
                         self.glossary[english] = telugu
-                        
-                        # Store uppercase version for case-insensitive matching
-                        if english.upper() != english:
-                            self.glossary[english.upper()] = telugu
-                        
-                        # Store lowercase version for case-insensitive matching
-                        if english.lower() != english:
-                            self.glossary[english.lower()] = telugu
             
             # Sort by length (longest first) to match longer phrases first
             self.glossary = OrderedDict(
                 sorted(self.glossary.items(), key=lambda x: len(x[0]), reverse=True)
             )
+            self._compile_pattern()
+            
+            # Content hash for callers that cache glossary-dependent output
+            # (e.g. translated text); changes whenever the entries change
+            h = hashlib.sha256()
+            for english, telugu in self.glossary.items():
+                h.update(english.encode('utf-8'))
+                h.update(b'\x1f')
+                h.update(telugu.encode('utf-8'))
+                h.update(b'\x1e')
+            self.version_hash = h.hexdigest()
+            
             print(f"Loaded {len(self.glossary)} glossary entries")
         except Exception as e:
             print(f"Error loading glossary: {e}")
             self.glossary = OrderedDict()
+            self._pattern = None
+            self._lookup = {}
+            self.version_hash = "empty"
+    
+    def _compile_pattern(self):
+        """
+        Compile all glossary terms into one alternation regex
+        
+        One case-insensitive scan over the text replaces the old
+        per-term re.sub loop (O(terms x text)). Terms are already
+        sorted longest-first, so the alternation prefers longer
+        phrases, matching the previous replacement order.
+        
+        No separate "does any term appear" probe pattern is kept: with
+        a single alternation, sub() already is that one C-level scan,
+        and it returns the input string unchanged (no copy) when
+        nothing matches, so a search() precheck would only scan the
+        text twice whenever there is a hit.
+        """
+        if not self.glossary:
+            self._pattern = None
+            self._lookup = {}
+            return
+        
+        self._lookup = {english.lower(): telugu for english, telugu in self.glossary.items()}
+        self._pattern = re.compile(
+            r'\b(?:' + '|'.join(re.escape(term) for term in self.glossary) + r')\b',
+            re.IGNORECASE
+        )
+        
+        # Memoize short inputs; rebuilt (and thus invalidated) whenever
+        # the glossary is reloaded
+        pattern = self._pattern
+        lookup = self._lookup
+        
+        @lru_cache(maxsize=8192)
+        def _apply_cached(text):
+            return pattern.sub(lambda m: lookup[m.group(0).lower()], text)
+        
+        self._apply_cached = _apply_cached
     
     def apply_glossary(self, text, strict_mode=True):
         """
         Apply glossary replacements to text (case-insensitive) with strict word boundaries
         
+        The term sort, escaping and regex compilation all happen once in
+        load_glossary; per call this only runs the precompiled pattern,
+        so there is no per-segment sort or compile cost.
+        
         Args:
             text: Input text to process
             strict_mode: If True, glossary terms override everything (default: True)
@@ -70,31 +131,18 @@ class GlossaryLoader:
         Returns:
             Text with glossary terms replaced
         """
-        if not self.glossary or not text:
+        if self._pattern is None or not text:
             return text
         
-        result = text
-        
-        # Sort by length (longest first) to match longer phrases first
-        sorted_terms = sorted(self.glossary.items(), key=lambda x: len(x[0]), reverse=True)
-        
-        # Replace glossary terms with word boundaries for exact matching
-        for english_term, telugu_term in sorted_terms:
-            if not english_term or not telugu_term:
-                continue
-            
-            # Escape special regex characters
-            escaped_term = re.escape(english_term)
-            
-            # Use word boundaries to ensure exact word/phrase matching
-            # This prevents partial matches within words
-            # \b matches word boundaries (start/end of word)
-            pattern = r'\b' + escaped_term + r'\b'
-            
-            # Replace all occurrences, case-insensitively
-            result = re.sub(pattern, telugu_term, result, flags=re.IGNORECASE)
+        # Repeated short strings (table cells, duplicate sentences) hit
+        # the LRU cache instead of re-running the scan
+        if len(text) <= _CACHE_MAX_LEN:
+            return self._apply_cached(text)
         
-        return result
+        # Single pass: the compiled alternation finds any glossary term
+        # at word boundaries and the callback maps it (case-insensitively)
+        # to its Telugu replacement
+        return self._pattern.sub(lambda m: self._lookup[m.group(0).lower()], text)
 
 # Global glossary instance
 _glossary_instance = None
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 LANGUAGES = {
     "Assamese": "asm_Beng",
     "Bengali": "ben_Beng",
@@ -27,6 +29,7 @@ LANGUAGES = {
     "Urdu": "urd_Arab"
 }
 
+@lru_cache(maxsize=64)
 def get_language_code(lang):
     """
     Returns the language code for a given language name.
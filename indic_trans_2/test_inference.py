@@ -1,13 +1,20 @@
 import requests
+from requests.adapters import HTTPAdapter
 import json
 
 # Using port 8080 (Nginx) which proxies to 8001 (FastAPI)
 BASE_URL = "http://localhost:8080" 
 
+# One shared session: keep-alive connections are reused across calls
+# instead of re-negotiating TCP with Nginx per request
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_maxsize=32))
+SESSION.headers.update({"Connection": "keep-alive"})
+
 def test_get_languages():
     print("Testing GET /languages...")
     try:
-        response = requests.get(f"{BASE_URL}/languages")
+        response = SESSION.get(f"{BASE_URL}/languages")
         response.raise_for_status()
         languages = response.json()
         print("Successfully retrieved languages.")
@@ -29,7 +36,7 @@ def test_translate():
     }
     
     try:
-        response = requests.post(f"{BASE_URL}/translate", json=payload)
+        response = SESSION.post(f"{BASE_URL}/translate", json=payload)
         response.raise_for_status()
         result = response.json()
         translations = result.get("translations", [])
@@ -53,7 +60,7 @@ def test_translate_custom_params():
     }
     
     try:
-        response = requests.post(f"{BASE_URL}/translate", json=payload)
+        response = SESSION.post(f"{BASE_URL}/translate", json=payload)
         response.raise_for_status()
         result = response.json()
         translations = result.get("translations", [])
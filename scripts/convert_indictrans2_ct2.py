@@ -0,0 +1,59 @@
+"""
+Offline converter: IndicTrans2 HuggingFace checkpoint -> CTranslate2
+
+Run this once (it is not part of the serving path) to produce a
+CTranslate2 model directory, then point the server at it with
+INDICTRANS2_CT2_DIR=<output_dir>. CTranslate2 replaces the Python
+HF generate loop with a C++ beam search and int8 quantized kernels.
+
+Usage:
+    python scripts/convert_indictrans2_ct2.py [--model MODEL] [--output-dir DIR] [--quantization Q]
+
+Requires: pip install ctranslate2
+"""
+
+import argparse
+import shutil
+import subprocess
+import sys
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert IndicTrans2 to CTranslate2")
+    parser.add_argument("--model", default="ai4bharat/indictrans2-en-indic-1B",
+                        help="HuggingFace model name (default: ai4bharat/indictrans2-en-indic-1B)")
+    parser.add_argument("--output-dir", default="ct2_model",
+                        help="Output directory for the converted model (default: ct2_model)")
+    parser.add_argument("--quantization", default="int8_float16",
+                        help="CTranslate2 quantization (default: int8_float16; use int8 for CPU-only)")
+    parser.add_argument("--force", action="store_true",
+                        help="Overwrite an existing output directory")
+    args = parser.parse_args()
+
+    converter = shutil.which("ct2-transformers-converter")
+    if not converter:
+        print("Error: ct2-transformers-converter not found. Install it with: pip install ctranslate2")
+        sys.exit(1)
+
+    cmd = [
+        converter,
+        "--model", args.model,
+        "--output_dir", args.output_dir,
+        "--quantization", args.quantization,
+        "--trust_remote_code",
+    ]
+    if args.force:
+        cmd.append("--force")
+
+    print(f"Converting {args.model} -> {args.output_dir} (quantization: {args.quantization})")
+    print(f"Running: {' '.join(cmd)}")
+    result = subprocess.run(cmd)
+    if result.returncode != 0:
+        print("Conversion failed")
+        sys.exit(result.returncode)
+
+    print(f"Done. Serve with: INDICTRANS2_CT2_DIR={args.output_dir} python app.py")
+
+
+if __name__ == "__main__":
+    main()
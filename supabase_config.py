@@ -3,6 +3,7 @@ Supabase configuration for feedback storage
 """
 
 import os
+import threading
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -20,22 +21,47 @@ except ImportError:
 SUPABASE_URL = os.getenv("SUPABASE_URL") or os.getenv("NEXT_PUBLIC_SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY") or os.getenv("NEXT_PUBLIC_SUPABASE_ANON_KEY")
 
+# Shared client: every call used to build a fresh Client (and with it a
+# fresh HTTP session), paying TCP+TLS setup per Supabase request. One
+# client per process keeps the underlying httpx session - and its
+# keep-alive connection pool - open for the process lifetime.
+_client = None
+_client_unavailable = False
+_client_lock = threading.Lock()
+
 def get_supabase_client():
-    """Get Supabase client"""
-    if not HAS_SUPABASE_LIB:
-        return None
-    
-    if not SUPABASE_URL or not SUPABASE_KEY or SUPABASE_URL == "your-supabase-url":
-        print("Warning: Supabase not configured. Set SUPABASE_URL and SUPABASE_KEY environment variables.")
-        return None
-    
-    try:
-        supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-        return supabase
-    except Exception as e:
-        print(f"Error creating Supabase client: {e}")
+    """Get the shared Supabase client (created once per process)"""
+    global _client, _client_unavailable
+    if _client is not None:
+        return _client
+    if _client_unavailable:
         return None
 
+    # Lock so concurrent first calls (feedback flusher + request threads)
+    # don't each build a client with its own connection pool
+    with _client_lock:
+        if _client is not None:
+            return _client
+        if _client_unavailable:
+            return None
+
+        if not HAS_SUPABASE_LIB:
+            _client_unavailable = True
+            return None
+
+        if not SUPABASE_URL or not SUPABASE_KEY or SUPABASE_URL == "your-supabase-url":
+            print("Warning: Supabase not configured. Set SUPABASE_URL and SUPABASE_KEY environment variables.")
+            _client_unavailable = True
+            return None
+
+        try:
+            _client = create_client(SUPABASE_URL, SUPABASE_KEY)
+            return _client
+        except Exception as e:
+            print(f"Error creating Supabase client: {e}")
+            _client_unavailable = True
+            return None
+
 def save_feedback(feedback_data):
     """Save feedback to Supabase"""
     try:
@@ -50,36 +76,47 @@ def save_feedback(feedback_data):
         print(f"Error saving feedback: {e}")
         return {"success": False, "error": str(e)}
 
+def _clean_comment(comment_data):
+    """
+    Clean a comment dict for insertion - remove None values, ensure proper
+    types and required fields. Returns (cleaned_dict, error) where exactly
+    one is None.
+    """
+    cleaned_data = {}
+    for key, value in comment_data.items():
+        if value is not None and value != '':
+            # Skip text_position entirely - it's optional and may cause issues
+            if key == 'text_position':
+                continue
+            # Ensure strings are not empty
+            if isinstance(value, str) and value.strip():
+                cleaned_data[key] = value.strip()
+            elif not isinstance(value, str):
+                cleaned_data[key] = value
+
+    # Ensure required fields are present
+    if 'translation_id' not in cleaned_data or not cleaned_data['translation_id']:
+        return None, "translation_id is required"
+    if 'doc_type' not in cleaned_data or not cleaned_data['doc_type']:
+        return None, "doc_type is required"
+    if 'comment' not in cleaned_data or not cleaned_data['comment']:
+        return None, "comment is required"
+    if 'selected_text' not in cleaned_data:
+        cleaned_data['selected_text'] = ''  # Default to empty string
+
+    return cleaned_data, None
+
 def save_comment(comment_data):
     """Save comment to Supabase"""
     try:
         supabase = get_supabase_client()
         if not supabase:
             return {"success": False, "error": "Supabase not configured"}
-        
-        # Clean the data - remove None values and ensure proper types
-        cleaned_data = {}
-        for key, value in comment_data.items():
-            if value is not None and value != '':
-                # Skip text_position entirely - it's optional and may cause issues
-                if key == 'text_position':
-                    continue
-                # Ensure strings are not empty
-                if isinstance(value, str) and value.strip():
-                    cleaned_data[key] = value.strip()
-                elif not isinstance(value, str):
-                    cleaned_data[key] = value
-        
-        # Ensure required fields are present
-        if 'translation_id' not in cleaned_data or not cleaned_data['translation_id']:
-            return {"success": False, "error": "translation_id is required"}
-        if 'doc_type' not in cleaned_data or not cleaned_data['doc_type']:
-            return {"success": False, "error": "doc_type is required"}
-        if 'comment' not in cleaned_data or not cleaned_data['comment']:
-            return {"success": False, "error": "comment is required"}
-        if 'selected_text' not in cleaned_data:
-            cleaned_data['selected_text'] = ''  # Default to empty string
-        
+
+        cleaned_data, error = _clean_comment(comment_data)
+        if error:
+            return {"success": False, "error": error}
+
         # Insert comment into 'comments' table
         response = supabase.table("comments").insert(cleaned_data).execute()
         return {"success": True, "data": response.data[0] if response.data else None}
@@ -89,6 +126,32 @@ def save_comment(comment_data):
         print(traceback.format_exc())
         return {"success": False, "error": str(e)}
 
+def save_comments_bulk(comment_list):
+    """
+    Save multiple comments in one Supabase insert - one round-trip instead
+    of one per comment for burst workloads
+    """
+    try:
+        supabase = get_supabase_client()
+        if not supabase:
+            return {"success": False, "error": "Supabase not configured"}
+
+        cleaned_rows = []
+        for comment_data in comment_list:
+            cleaned_data, error = _clean_comment(comment_data)
+            if error:
+                return {"success": False, "error": error}
+            cleaned_rows.append(cleaned_data)
+
+        if not cleaned_rows:
+            return {"success": True, "data": []}
+
+        response = supabase.table("comments").insert(cleaned_rows).execute()
+        return {"success": True, "data": response.data}
+    except Exception as e:
+        print(f"Error saving comments bulk: {e}")
+        return {"success": False, "error": str(e)}
+
 def get_comments(translation_id, engine=None):
     """Get comments for a translation, optionally filtered by engine"""
     try:
@@ -0,0 +1,82 @@
+-- ============================================================================
+-- SUPABASE HISTORY RPC
+-- ============================================================================
+-- Run this script in your Supabase SQL Editor to create the
+-- get_user_history function used by the /translation-history endpoint.
+-- It aggregates translation_logs, feedback and comments into the
+-- pre-shaped session JSON in a single query, so the Flask handler does
+-- one RPC roundtrip instead of pulling raw rows and grouping in Python.
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION get_user_history(uid TEXT)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+  WITH sessions AS (
+    SELECT
+      btrim(translation_id) AS tid,
+      MAX(created_at) AS created_at,
+      jsonb_object_agg(
+        translation_model,
+        jsonb_build_object(
+          'source_text', source_text,
+          'translated_text', translated_text,
+          'engine', translation_model,
+          'created_at', created_at
+        )
+      ) AS translations
+    FROM translation_logs
+    WHERE user_id = uid
+      AND translation_id IS NOT NULL
+      AND btrim(translation_id) <> ''
+    GROUP BY btrim(translation_id)
+  ),
+  fb AS (
+    -- Most recent feedback per (session, engine)
+    SELECT tid, jsonb_object_agg(engine, fbdata) AS feedback
+    FROM (
+      SELECT DISTINCT ON (translation_id, COALESCE(translation_method, translation_model))
+        translation_id AS tid,
+        COALESCE(translation_method, translation_model) AS engine,
+        jsonb_build_object(
+          'overall_quality', overall_quality,
+          'structure_preservation', structure_preservation,
+          'preview_features', preview_features,
+          'thumbs_rating', thumbs_rating,
+          'criteria_ratings', criteria_ratings,
+          'suggestions', suggestions,
+          'created_at', created_at
+        ) AS fbdata
+      FROM feedback
+      WHERE user_id = uid
+        AND COALESCE(translation_method, translation_model) IS NOT NULL
+      ORDER BY translation_id,
+               COALESCE(translation_method, translation_model),
+               created_at DESC
+    ) latest
+    GROUP BY tid
+  ),
+  cm AS (
+    SELECT translation_id AS tid,
+           jsonb_agg(to_jsonb(comments.*) ORDER BY created_at DESC) AS comments
+    FROM comments
+    GROUP BY translation_id
+  )
+  SELECT COALESCE(
+    jsonb_agg(
+      jsonb_build_object(
+        'translation_id', s.tid,
+        'created_at', s.created_at,
+        'translations', s.translations,
+        'feedback', COALESCE(fb.feedback, '{}'::jsonb),
+        'comments', COALESCE(cm.comments, '[]'::jsonb)
+      )
+      ORDER BY s.created_at DESC
+    ),
+    '[]'::jsonb
+  )
+  FROM sessions s
+  LEFT JOIN fb ON fb.tid = s.tid
+  LEFT JOIN cm ON cm.tid = s.tid;
+$$;
@@ -10,6 +10,39 @@ from translation_engine import translate_batch, get_available_engines
 from glossary import get_glossary
 from feedback_logging import log_translation
 
+# Segments per translate_batch call - keeps peak memory (and the GPU KV
+# cache for local engines) bounded no matter how long the document is
+_BATCH_SIZE = 32
+
+def _needs_translation(text):
+    """
+    Whitespace-only, numeric or punctuation-only segments (page numbers,
+    separators) come back from the model unchanged - skip translating them
+    """
+    return any(ch.isalpha() for ch in text)
+
+def _iter_paragraphs(doc):
+    """
+    Yield (kind, paragraph) pairs for every paragraph in the document:
+    body, table cells, headers and footers
+    """
+    for para in doc.paragraphs:
+        yield ('paragraph', para)
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                for para in cell.paragraphs:
+                    yield ('table_cell', para)
+    # A section whose header/footer is "linked to previous" has no part of
+    # its own - it shows the previous section's content - so walking it
+    # would re-translate (and re-write) the same paragraphs
+    for section in doc.sections:
+        for kind, container in (('header', section.header), ('footer', section.footer)):
+            if container.is_linked_to_previous:
+                continue
+            for para in container.paragraphs:
+                yield (kind, para)
+
 class UnifiedDOCXTranslator:
     """Unified DOCX Translator supporting multiple engines"""
     
@@ -44,38 +77,14 @@ class UnifiedDOCXTranslator:
         print(f"Reading DOCX file: {input_path}")
         doc = Document(input_path)
         
-        # Extract all text elements
-        all_texts = []
-        text_elements = []
-        
-        # Paragraphs
-        for para in doc.paragraphs:
-            if para.text.strip():
-                all_texts.append(para.text)
-                text_elements.append(('paragraph', para))
-        
-        # Tables
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    for para in cell.paragraphs:
-                        if para.text.strip():
-                            all_texts.append(para.text)
-                            text_elements.append(('table_cell', para))
-        
-        # Headers and footers
-        for section in doc.sections:
-            for header in [section.header]:
-                for para in header.paragraphs:
-                    if para.text.strip():
-                        all_texts.append(para.text)
-                        text_elements.append(('header', para))
-            
-            for footer in [section.footer]:
-                for para in footer.paragraphs:
-                    if para.text.strip():
-                        all_texts.append(para.text)
-                        text_elements.append(('footer', para))
+        # Extract all text elements in one pass. para.text is a property that
+        # re-concatenates the paragraph's runs, so read it exactly once
+        items = [(kind, para, text)
+                 for kind, para in _iter_paragraphs(doc)
+                 for text in (para.text,)
+                 if text.strip() and _needs_translation(text)]
+        all_texts = [text for _, _, text in items]
+        text_elements = [(kind, para) for kind, para, _ in items]
         
         if not all_texts:
             print("No text found in document")
@@ -83,10 +92,24 @@ class UnifiedDOCXTranslator:
         
         print(f"Translating {len(all_texts)} text segments...")
         
-        # Translate all texts
+        # Deduplicate identical segments (page headers, boilerplate, repeated
+        # table cells) - each unique string is translated once and mapped back
+        unique_texts = list(dict.fromkeys(all_texts))
+        if len(unique_texts) < len(all_texts):
+            print(f"[{self.engine}] Deduplicated {len(all_texts)} segments to {len(unique_texts)} unique")
+
+        # Translate unique texts in mini-batches rather than one giant call,
+        # so memory stays bounded and long documents can't OOM the engine
         try:
-            print(f"[{self.engine}] Starting batch translation of {len(all_texts)} segments...")
-            translations = translate_batch(all_texts, engine=self.engine, glossary=self.glossary)
+            print(f"[{self.engine}] Starting batch translation of {len(unique_texts)} segments...")
+            unique_translations = []
+            for start in range(0, len(unique_texts), _BATCH_SIZE):
+                chunk = unique_texts[start:start + _BATCH_SIZE]
+                unique_translations.extend(translate_batch(chunk, engine=self.engine, glossary=self.glossary))
+                if len(unique_texts) > _BATCH_SIZE:
+                    print(f"[{self.engine}] Translated {len(unique_translations)}/{len(unique_texts)} segments")
+            trans_map = dict(zip(unique_texts, unique_translations))
+            translations = [trans_map[text] for text in all_texts]
             print(f"[{self.engine}] Batch translation completed: {len(translations)} translations received")
         except Exception as e:
             print(f"[{self.engine}] ERROR in batch translation: {str(e)}")
@@ -101,12 +124,16 @@ class UnifiedDOCXTranslator:
             translated_text = "\n\n".join(translations)
             log_translation(user_id, self.engine, source_text, translated_text, translation_id)
         
-        # Replace text in document
-        translation_idx = 0
-        for element_type, element in text_elements:
-            if translation_idx < len(translations):
-                element.text = translations[translation_idx]
-                translation_idx += 1
+        # Replace text in document. Assigning para.text would discard every
+        # run and its character formatting, so write the translation into the
+        # paragraph's first run (keeping its style) and clear the rest
+        for (element_type, element), translation in zip(text_elements, translations):
+            if element.runs:
+                element.runs[0].text = translation
+                for run in element.runs[1:]:
+                    run.text = ""
+            else:
+                element.text = translation
         
         # Save translated document with retry logic for file locking issues
         max_retries = 3
@@ -6,11 +6,60 @@ Uses glossary.csv via GlossaryLoader for strict terminology enforcement
 
 import os
 import re
+import hashlib
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import time
+import asyncio
+import threading
 from dotenv import load_dotenv
-from glossary import GlossaryLoader
+from glossary import GlossaryLoader, apply_glossary
+
+# Optional async HTTP client - when installed, batch chunks are translated
+# concurrently instead of one blocking round-trip at a time
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+
+# In-flight request cap for the async batch path
+_ASYNC_CONCURRENCY = 4
+
+# Optional fast JSON codec - payloads embed the full prompt (glossary block
+# included) and responses carry whole translated chunks, so each call
+# encodes/decodes tens of KB; orjson does both several times faster than
+# the stdlib and falls back to json when not installed
+try:
+    import orjson
+    def _json_dumps(obj):
+        return orjson.dumps(obj)
+    def _json_loads(raw):
+        return orjson.loads(raw)
+except ImportError:
+    def _json_dumps(obj):
+        return json.dumps(obj).encode('utf-8')
+    def _json_loads(raw):
+        return json.loads(raw)
+
+# Optional persistent response cache keyed by (text, glossary version):
+# hits skip the rate limiter and the network entirely and consume no quota.
+# diskcache keeps a hot in-memory layer over the SQLite file, so repeat
+# lookups are sub-millisecond.
+try:
+    import diskcache
+    _CACHE = diskcache.Cache(os.getenv("GEMINI_CACHE_DIR", "/tmp/gemini_cache"),
+                             size_limit=2**30)
+except ImportError:
+    _CACHE = None
+
+def _cache_key(text, glossary):
+    """Content-addressed key: same text + same glossary = same translation"""
+    return hashlib.sha256(
+        (text + "\x00" + glossary.version_hash).encode('utf-8')
+    ).hexdigest()
 
 # Load environment variables from .env file
 load_dotenv()
@@ -23,233 +72,342 @@ if not GEMINI_API_KEY:
     raise ValueError("GEMINI_API_KEY environment variable is required. Please set it in your .env file.")
 GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent"
 
-# Rate limiting - track requests per minute
-_last_request_time = {}
+# One pooled session for the blocking path: keep-alive reuses the TCP+TLS
+# connection to the Gemini endpoint instead of paying a fresh handshake
+# per chunk, and transient 429/5xx responses are retried with backoff.
+# POST must be allowed explicitly - urllib3's default allowed_methods
+# excludes it - and is safe here because generateContent is idempotent.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.3,
+                      status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=frozenset({"POST"})),
+))
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter. Allows short bursts up to
+    `capacity` while smoothing sustained throughput to `rate` tokens/sec.
+    Unlike the old per-model timestamp dict, it stays correct when the
+    async batch path has several requests in flight at once.
+    """
+
+    def __init__(self, capacity, rate):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self, n):
+        """Take n tokens if available, else return the time to wait"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity,
+                              self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+            if self.tokens >= n:
+                self.tokens -= n
+                return 0.0
+            return (n - self.tokens) / self.rate
+
+    def acquire(self, n=1):
+        """Block until n tokens are available"""
+        while True:
+            wait = self._take(n)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, n=1):
+        """Async variant - yields to the event loop instead of blocking it"""
+        while True:
+            wait = self._take(n)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+# Rate limiting - sized for ~600 requests/min with a burst of 10; tune the
+# rate to (actual RPM quota) / 60 if the project's quota changes
+_RPM_BUCKET = TokenBucket(capacity=10, rate=10.0)
 
 # Separator for batch translation (must be unique and unlikely to appear in text)
 # Using a very unique pattern with numbers and special chars that won't be translated
 SEPARATOR = "___SEGMENT_BREAK_XYZ789___"
 
+# Static prompt pieces, rendered once at import. The rules block never
+# changes and the structure note only depends on the constant SEPARATOR,
+# so per-call prompt assembly is a join of prebuilt strings
+_PROMPT_HEAD = """You are an expert Telugu translator specializing in official government documents and legal texts. Your translations must be accurate, formal, and maintain the exact structure of the original document.
+
+CRITICAL TRANSLATION RULES (MUST FOLLOW):
+
+1. **GLOSSARY TERMS ARE MANDATORY**: When you see any English term from the glossary below, you MUST use the EXACT Telugu translation provided. Do NOT translate glossary terms differently.
+
+2. **PRESERVE STRUCTURE COMPLETELY**: 
+   - Keep all line breaks, paragraphs, and spacing exactly as in the original
+   - Preserve all numbers, dates, codes, and abbreviations exactly (e.g., "G.O.Rt.No.239" stays as "G.O.Rt.No.239")
+   - Keep all punctuation marks, special characters, and formatting
+
+3. **FORMAL GOVERNMENT LANGUAGE**: Use formal, official Telugu suitable for government orders, circulars, and official communications. Avoid colloquial or informal language.
+
+4. **ACCURACY FIRST**: Translate with maximum accuracy. Every word matters in government documents.
+
+5. **NO ADDITIONS**: Do not add explanations, notes, or commentary. Only provide the Telugu translation.
+
+6. **CONTEXT AWARENESS**: Understand the context and translate accordingly, but always prioritize glossary terms when they appear."""
+
+_STRUCTURE_NOTE = f"\n\nCRITICAL STRUCTURE PRESERVATION:\nThe text contains '{SEPARATOR}' markers. These are STRUCTURE MARKERS, NOT content.\n- DO NOT translate these markers\n- DO NOT change these markers\n- DO NOT remove these markers\n- DO NOT modify these markers in any way\n- Keep them EXACTLY as '{SEPARATOR}'\n- Translate only the text BETWEEN the markers\n- Each segment between markers should be translated separately\n- The markers must appear in your output EXACTLY as shown above"
+
 # -------------------------------
 # Output Cleaner
 # -------------------------------
+# Precompiled cleaners: compiled once at import, and the blocklist of
+# unwanted English phrases collapses into one alternation pass instead of
+# eleven separate str.replace scans per segment
+_RE_BLOCK = re.compile(
+    r'Please provide|You have indicated|appears to be|Here is|Translation'
+    r'|Note:|NOTE:|Important:|As an AI|Text to translate|Source text'
+)
+_RE_JUNK = re.compile(r'[@#\-\*=]{2,}')
+_RE_WS = re.compile(r'\s+')
+
+# Telugu codepoint detector - C-level scan that short-circuits at the
+# first match, vs a per-character Python generator over multi-KB strings
+_RE_TELUGU = re.compile(r'[\u0C00-\u0C7F]')
+
 def clean_telugu_output(text):
     """Clean output to ensure pure Telugu"""
     if not text:
         return ""
-    
+
     # Strip quotes + trim
     text = text.strip().strip('"').strip("'").strip()
-    
-    # Remove known unwanted English phrases
-    BLOCKLIST = [
-        "Please provide", "You have indicated",
-        "appears to be", "Here is", "Translation",
-        "Note:", "NOTE:", "Important:", "As an AI", 
-        "Text to translate", "Source text"
-    ]
-    
-    for bad in BLOCKLIST:
-        text = text.replace(bad, "")
-    
+
+    # Remove known unwanted English phrases (single alternation pass)
+    text = _RE_BLOCK.sub("", text)
+
     # Remove placeholder artifacts
-    text = re.sub(r'[@#\-\*=]{2,}', "", text)
-    
+    text = _RE_JUNK.sub("", text)
+
     # Collapse excessive spacing
-    text = re.sub(r"\s+", " ", text).strip()
-    
-    return text
+    return _RE_WS.sub(" ", text).strip()
 
 # -------------------------------
 # Main Translator
 # -------------------------------
-def translate_with_gemini(text, glossary=None, enforce_glossary=True):
-    """Translate English → Government-Grade Telugu"""
-    
-    if not text or not text.strip():
-        return text
-    
-    if not GEMINI_API_KEY:
-        return f"GEMINI_API_KEY not set. Original: {text}"
-    
-    if glossary is None:
-        glossary = GlossaryLoader()
-    
-    # Prepare glossary section
-    glossary_entries = "\n".join(
-        [f'"{eng}" → "{tel}"' for eng, tel in list(glossary.glossary.items())[:500]]
+def _glossary_prompt(glossary):
+    """
+    Rendered glossary section of the prompt. The bytes are identical for
+    every chunk in a batch, so render once and cache on the loader
+    instance; version_hash invalidates the cache on glossary reload.
+    """
+    cached = getattr(glossary, '_prompt_cache', None)
+    if cached is not None and cached[0] == glossary.version_hash:
+        return cached[1]
+    rendered = "\n".join(
+        f'"{eng}" → "{tel}"' for eng, tel in list(glossary.glossary.items())[:500]
     )
+    glossary._prompt_cache = (glossary.version_hash, rendered)
+    return rendered
+
+def _build_payload(text, glossary):
+    """Build the Gemini generateContent request payload for one prompt"""
+    # Prepare glossary section (rendered once per glossary version)
+    glossary_entries = _glossary_prompt(glossary)
     
     # Check if text contains separator markers (batched text)
     has_separators = SEPARATOR in text
     
-    # Professional system prompt
-    structure_note = ""
-    if has_separators:
-        structure_note = f"\n\nCRITICAL STRUCTURE PRESERVATION:\nThe text contains '{SEPARATOR}' markers. These are STRUCTURE MARKERS, NOT content.\n- DO NOT translate these markers\n- DO NOT change these markers\n- DO NOT remove these markers\n- DO NOT modify these markers in any way\n- Keep them EXACTLY as '{SEPARATOR}'\n- Translate only the text BETWEEN the markers\n- Each segment between markers should be translated separately\n- The markers must appear in your output EXACTLY as shown above"
-    
-    prompt = f"""You are an expert Telugu translator specializing in official government documents and legal texts. Your translations must be accurate, formal, and maintain the exact structure of the original document.
+    # str.join over prebuilt pieces - no re-interpolation of the large
+    # constant blocks per chunk
+    prompt = "".join((
+        _PROMPT_HEAD,
+        _STRUCTURE_NOTE if has_separators else "",
+        "\n\nMANDATORY GLOSSARY (Use these EXACT translations):\n",
+        glossary_entries,
+        "\n\nNow translate the following English text to Telugu following all rules above:\n\n",
+        text,
+        "\n\nTelugu Translation:",
+    ))
 
-CRITICAL TRANSLATION RULES (MUST FOLLOW):
+    return {
+        "contents": [{
+            "parts": [{
+                "text": prompt
+            }]
+        }],
+        "generationConfig": {
+            "temperature": 0.0,  # Lower temperature for more consistent, accurate translations
+            "topK": 1,  # More deterministic output
+            "topP": 0.95,
+            "maxOutputTokens": 8192
+        }
+    }
 
-1. **GLOSSARY TERMS ARE MANDATORY**: When you see any English term from the glossary below, you MUST use the EXACT Telugu translation provided. Do NOT translate glossary terms differently.
+def _debug_dump(data):
+    """Compact response dump for error logs - only built on failure paths"""
+    try:
+        return json.dumps(data)[:1000]
+    except Exception:
+        return str(data)[:1000]
 
-2. **PRESERVE STRUCTURE COMPLETELY**: 
-   - Keep all line breaks, paragraphs, and spacing exactly as in the original
-   - Preserve all numbers, dates, codes, and abbreviations exactly (e.g., "G.O.Rt.No.239" stays as "G.O.Rt.No.239")
-   - Keep all punctuation marks, special characters, and formatting
+def _raise_blocked(finish_reason, fallback_msg):
+    """Map a blocking finishReason to its specific error, else fall back"""
+    if finish_reason == 'SAFETY':
+        raise Exception("Gemini response blocked by safety filters")
+    if finish_reason == 'RECITATION':
+        raise Exception("Gemini response blocked due to recitation policy")
+    raise Exception(fallback_msg)
 
-3. **FORMAL GOVERNMENT LANGUAGE**: Use formal, official Telugu suitable for government orders, circulars, and official communications. Avoid colloquial or informal language.
+def _parse_response(data, text, glossary):
+    """
+    Extract, validate and post-process the translation from a Gemini
+    response. Guard clauses raise on each failure mode up front, so the
+    happy path reads straight through and debug serialization of the
+    response body is only ever built when something went wrong.
+    """
+    if not data.get('candidates'):
+        print(f"[Gemini] ERROR: No candidates in response")
+        print(f"[Gemini] Full response: {_debug_dump(data)}")
+        raise Exception("Gemini API returned no candidates in response")
 
-4. **ACCURACY FIRST**: Translate with maximum accuracy. Every word matters in government documents.
+    candidate = data['candidates'][0]
+    parts = candidate.get('content', {}).get('parts', [])
+    if not parts:
+        finish_reason = candidate.get('finishReason', 'UNKNOWN')
+        print(f"[Gemini] ERROR: No parts in response, finish reason: {finish_reason}")
+        print(f"[Gemini] Full response: {_debug_dump(data)}")
+        _raise_blocked(finish_reason, f"Gemini returned no parts, finish reason: {finish_reason}")
 
-5. **NO ADDITIONS**: Do not add explanations, notes, or commentary. Only provide the Telugu translation.
+    # Try different ways to get the text
+    if 'text' in parts[0]:
+        translated = parts[0]['text'].strip()
+    elif isinstance(parts[0], str):
+        translated = parts[0].strip()
+    else:
+        # Try to get text from the part directly
+        translated = str(parts[0]).strip()
+        print(f"WARNING: Using string conversion for parts[0]: {translated[:100]}")
+
+    if not translated:
+        # Empty text - might be blocked or filtered
+        finish_reason = candidate.get('finishReason', 'UNKNOWN')
+        print(f"[Gemini] ERROR: Empty translation response, finish reason: {finish_reason}")
+        print(f"[Gemini] Full response: {_debug_dump(data)}")
+        _raise_blocked(finish_reason, f"Gemini returned empty response, finish reason: {finish_reason}")
 
-6. **CONTEXT AWARENESS**: Understand the context and translate accordingly, but always prioritize glossary terms when they appear.{structure_note}
+    # Check if we got a valid translation (should contain Telugu characters)
+    if _RE_TELUGU.search(translated) is None and len(translated) > 50:
+        print(f"[Gemini] ERROR: Gemini returned English instead of Telugu!")
+        print(f"[Gemini] Response preview: {translated[:500]}")
+        print(f"[Gemini] Full response structure: {_debug_dump(data)}")
+        if 'Telugu Translation:' in translated:
+            # Try to extract after "Telugu Translation:"
+            extracted = translated.split('Telugu Translation:', 1)[1]
+            # Remove any leading/trailing quotes or markers
+            extracted = extracted.strip().strip('"').strip("'").strip()
+            if _RE_TELUGU.search(extracted) is None or len(extracted) <= 10:
+                print(f"[Gemini] ERROR: Still no Telugu after extraction")
+                raise Exception("Gemini returned English instead of Telugu translation")
+            print(f"[Gemini] Found translation after extraction (length: {len(extracted)} chars)")
+            translated = extracted
+        elif 'translation' in translated.lower() and len(translated) > 200:
+            # Might be a response explaining why it can't translate
+            print(f"[Gemini] Response seems to be an explanation, not a translation")
+            raise Exception("Gemini returned explanation instead of translation")
+        elif translated.strip() == text.strip()[:len(translated.strip())]:
+            raise Exception("Gemini returned original text instead of translation")
+        else:
+            raise Exception("Gemini returned English text instead of Telugu translation")
 
-MANDATORY GLOSSARY (Use these EXACT translations):
-{glossary_entries}
+    # Clean the output (but preserve separators if present)
+    if SEPARATOR not in translated:
+        translated = clean_telugu_output(translated)
+    else:
+        # If separators are present, clean each segment separately
+        segments = translated.split(SEPARATOR)
+        cleaned_segments = [clean_telugu_output(seg) for seg in segments]
+        translated = SEPARATOR.join(cleaned_segments)
 
-Now translate the following English text to Telugu following all rules above:
+    # Enforce glossary terminology to a fixed point: stop as soon as a
+    # pass changes nothing (usually after the first), with the old cap
+    # of 5 kept as a safety bound
+    for _ in range(5):
+        reapplied = apply_glossary(translated, glossary, strict_mode=True)
+        if reapplied == translated:
+            break
+        translated = reapplied
 
-{text}
+    return translated
 
-Telugu Translation:"""
+def _collect_sse_response(response):
+    """
+    Assemble a complete generateContent-shaped response from a
+    streamGenerateContent SSE stream. Text deltas are consumed as they
+    arrive over the wire instead of waiting for the server to buffer the
+    full response, which cuts wall time on long chunks and keeps slow
+    generations from tripping proxy idle timeouts.
+    """
+    text_parts = []
+    finish_reason = None
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data: "):
+            continue
+        event = _json_loads(line[6:])
+        for candidate in event.get('candidates', []):
+            for part in candidate.get('content', {}).get('parts', []):
+                if 'text' in part:
+                    text_parts.append(part['text'])
+            if candidate.get('finishReason'):
+                finish_reason = candidate['finishReason']
+    if not text_parts and finish_reason is None:
+        # Nothing usable arrived - let _parse_response report no candidates
+        return {}
+    candidate = {"content": {"parts": [{"text": "".join(text_parts)}]}}
+    if finish_reason:
+        candidate["finishReason"] = finish_reason
+    return {"candidates": [candidate]}
+
+def translate_with_gemini(text, glossary=None, enforce_glossary=True):
+    """Translate English → Government-Grade Telugu"""
+    
+    if not text or not text.strip():
+        return text
+    
+    if not GEMINI_API_KEY:
+        return f"GEMINI_API_KEY not set. Original: {text}"
+    
+    if glossary is None:
+        glossary = GlossaryLoader()
+    
+    cache_key = _cache_key(text, glossary)
+    if _CACHE is not None:
+        cached = _CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+    
+    payload = _build_payload(text, glossary)
     
     # Send to Gemini using REST API
     try:
-        # Rate limiting - minimal delay (0.5 seconds) for faster processing
-        current_time = time.time()
-        model_name = "gemini-2.5-flash"
-        if model_name in _last_request_time:
-            time_since_last = current_time - _last_request_time[model_name]
-            if time_since_last < 0.5:  # Minimal delay - 0.5 seconds between requests
-                wait_time = 0.5 - time_since_last
-                time.sleep(wait_time)
-        
-        url = f"{GEMINI_API_URL}?key={GEMINI_API_KEY}"
-        
-        payload = {
-            "contents": [{
-                "parts": [{
-                    "text": prompt
-                }]
-            }],
-            "generationConfig": {
-                "temperature": 0.0,  # Lower temperature for more consistent, accurate translations
-                "topK": 1,  # More deterministic output
-                "topP": 0.95,
-                "maxOutputTokens": 8192
-            }
-        }
+        # Rate limiting - token bucket smooths to the RPM quota
+        _RPM_BUCKET.acquire(1)
         
+        # Streaming endpoint: same model and payload, but the translation
+        # arrives as SSE deltas instead of one buffered response
+        stream_endpoint = GEMINI_API_URL.replace(":generateContent", ":streamGenerateContent")
+        url = f"{stream_endpoint}?alt=sse&key={GEMINI_API_KEY}"
         headers = {
             "Content-Type": "application/json"
         }
-        
-        response = requests.post(url, json=payload, headers=headers, timeout=60)
-        
-        if response.status_code == 200:
-            data = response.json()
-            
-            if 'candidates' in data and len(data['candidates']) > 0:
-                candidate = data['candidates'][0]
-                content = candidate.get('content', {})
-                parts = content.get('parts', [])
-                    
-                if parts and len(parts) > 0:
-                    # Try different ways to get the text
-                    if 'text' in parts[0]:
-                        translated = parts[0]['text'].strip()
-                    elif isinstance(parts[0], str):
-                        translated = parts[0].strip()
-                    else:
-                        # Try to get text from the part directly
-                        translated = str(parts[0]).strip()
-                        print(f"WARNING: Using string conversion for parts[0]: {translated[:100]}")
-                    
-                    if translated:
-                        _last_request_time[model_name] = time.time()
-                        
-                        # Check if we got a valid translation (should contain Telugu characters)
-                        has_telugu = any("\u0C00" <= ch <= "\u0C7F" for ch in translated)
-                        if not has_telugu and len(translated) > 50:
-                            print(f"[Gemini] ERROR: Gemini returned English instead of Telugu!")
-                            print(f"[Gemini] Response preview: {translated[:500]}")
-                            print(f"[Gemini] Full response structure: {json.dumps(data, indent=2)[:1000]}")
-                            # Try to extract translation if it's buried in the response
-                            if 'Telugu Translation:' in translated:
-                                # Try to extract after "Telugu Translation:"
-                                parts = translated.split('Telugu Translation:', 1)
-                                if len(parts) > 1:
-                                    extracted = parts[1].strip()
-                                    # Remove any leading/trailing quotes or markers
-                                    extracted = extracted.strip('"').strip("'").strip()
-                                    if any("\u0C00" <= ch <= "\u0C7F" for ch in extracted) and len(extracted) > 10:
-                                        print(f"[Gemini] Found translation after extraction (length: {len(extracted)} chars)")
-                                        translated = extracted
-                                    else:
-                                        print(f"[Gemini] ERROR: Still no Telugu after extraction")
-                                        raise Exception("Gemini returned English instead of Telugu translation")
-                                else:
-                                    raise Exception("Gemini returned English instead of Telugu translation")
-                            elif 'translation' in translated.lower() and len(translated) > 200:
-                                # Might be a response explaining why it can't translate
-                                print(f"[Gemini] Response seems to be an explanation, not a translation")
-                                raise Exception("Gemini returned explanation instead of translation")
-                            else:
-                                # Check if it's just the original text
-                                if translated.strip() == text.strip()[:len(translated.strip())]:
-                                    raise Exception("Gemini returned original text instead of translation")
-                                else:
-                                    raise Exception("Gemini returned English text instead of Telugu translation")
-                        
-                        # Remove any accidental separator-like text that might have been translated
-                        # Clean up any variations of the separator that might appear
-                        # But preserve the actual separator if it exists
-                        
-                        # Clean the output (but preserve separators if present)
-                        if SEPARATOR not in translated:
-                            translated = clean_telugu_output(translated)
-                        else:
-                            # If separators are present, clean each segment separately
-                            segments = translated.split(SEPARATOR)
-                            cleaned_segments = [clean_telugu_output(seg) for seg in segments]
-                            translated = SEPARATOR.join(cleaned_segments)
-                        
-                        # Apply glossary multiple times to enforce terminology (more aggressive)
-                        from glossary import apply_glossary
-                        for _ in range(5):  # Increased from 3 to 5 for better glossary enforcement
-                            translated = apply_glossary(translated, glossary, strict_mode=True)
-                        
-                        return translated
-                    else:
-                        # Empty text - might be blocked or filtered
-                        finish_reason = candidate.get('finishReason', 'UNKNOWN')
-                        print(f"[Gemini] ERROR: Empty translation response, finish reason: {finish_reason}")
-                        print(f"[Gemini] Full response: {json.dumps(data, indent=2)[:1000]}")
-                        if finish_reason == 'SAFETY':
-                            raise Exception("Gemini response blocked by safety filters")
-                        elif finish_reason == 'RECITATION':
-                            raise Exception("Gemini response blocked due to recitation policy")
-                        else:
-                            raise Exception(f"Gemini returned empty response, finish reason: {finish_reason}")
-                else:
-                    # No parts - check finish reason
-                    finish_reason = candidate.get('finishReason', 'UNKNOWN')
-                    print(f"[Gemini] ERROR: No parts in response, finish reason: {finish_reason}")
-                    print(f"[Gemini] Full response: {json.dumps(data, indent=2)[:1000]}")
-                    if finish_reason == 'SAFETY':
-                        raise Exception("Gemini response blocked by safety filters")
-                    elif finish_reason == 'RECITATION':
-                        raise Exception("Gemini response blocked due to recitation policy")
-                    else:
-                        raise Exception(f"Gemini returned no parts, finish reason: {finish_reason}")
-            else:
-                print(f"[Gemini] ERROR: No candidates in response")
-                print(f"[Gemini] Full response: {json.dumps(data, indent=2)[:1000]}")
-                raise Exception("Gemini API returned no candidates in response")
-        else:
+
+        response = _SESSION.post(url, data=_json_dumps(payload), headers=headers,
+                                 timeout=60, stream=True)
+
+        if response.status_code != 200:
             error_text = response.text[:1000] if hasattr(response, 'text') else str(response)
             print(f"[Gemini] ERROR: API returned status {response.status_code}")
             print(f"[Gemini] Error response: {error_text}")
@@ -259,7 +417,12 @@ Telugu Translation:"""
             except:
                 pass
             raise Exception(f"Gemini API error: {response.status_code} - {error_text[:200]}")
-            
+        
+        translated = _parse_response(_collect_sse_response(response), text, glossary)
+        if _CACHE is not None:
+            _CACHE[cache_key] = translated
+        return translated
+        
     except Exception as e:
         print(f"[Gemini] CRITICAL: Translation error: {e}")
         import traceback
@@ -267,66 +430,152 @@ Telugu Translation:"""
         # Don't return original text silently - raise error so caller knows
         raise Exception(f"Gemini translation failed: {str(e)}")
 
+async def _translate_chunks_async(chunk_texts, glossary):
+    """
+    Translate pre-joined chunk texts concurrently with httpx.AsyncClient.
+    Returns one entry per chunk: the translated text, or the exception that
+    chunk raised (so the caller can apply its per-chunk error policy).
+    """
+    sem = asyncio.Semaphore(_ASYNC_CONCURRENCY)
+    url = f"{GEMINI_API_URL}?key={GEMINI_API_KEY}"
+
+    async with httpx.AsyncClient() as client:
+        async def translate_chunk(chunk_text):
+            cache_key = _cache_key(chunk_text, glossary)
+            if _CACHE is not None:
+                cached = _CACHE.get(cache_key)
+                if cached is not None:
+                    return cached
+            payload = _build_payload(chunk_text, glossary)
+            async with sem:
+                await _RPM_BUCKET.acquire_async(1)
+                response = await client.post(
+                    url, content=_json_dumps(payload),
+                    headers={"Content-Type": "application/json"}, timeout=60)
+            if response.status_code != 200:
+                error_text = response.text[:1000]
+                print(f"[Gemini] ERROR: API returned status {response.status_code}")
+                print(f"[Gemini] Error response: {error_text}")
+                raise Exception(f"Gemini API error: {response.status_code} - {error_text[:200]}")
+            translated = _parse_response(_json_loads(response.content), chunk_text, glossary)
+            if _CACHE is not None:
+                _CACHE[cache_key] = translated
+            return translated
+
+        return await asyncio.gather(
+            *(translate_chunk(chunk_text) for chunk_text in chunk_texts),
+            return_exceptions=True,
+        )
+
 # -------------------------------
 # Batch Translator
 # -------------------------------
+# All the corrupted separator variants the model has been seen to emit,
+# normalized in one scan instead of a regex pass plus two str.replace
+# passes over the full chunk
+_RE_SEP_FIXUP = re.compile(r'\|{3,}|\|{2}SEGMENT\|{2}')
+
+def _split_translated_chunk(translated_chunk, chunk):
+    """Split a translated chunk back into per-sentence translations"""
+    # Clean up any corrupted separator patterns
+    translated_chunk = _RE_SEP_FIXUP.sub(SEPARATOR, translated_chunk)
+
+    chunk_translations = translated_chunk.split(SEPARATOR)
+    
+    # Ensure we have the right number of translations
+    while len(chunk_translations) < len(chunk):
+        chunk_translations.append("")
+    
+    return chunk_translations[:len(chunk)]
+
+def _is_api_key_error(error_msg):
+    """True for permission/API-key failures where falling back to the
+    original text (so other engines can continue) beats failing the batch"""
+    return ("403" in error_msg or "PERMISSION_DENIED" in error_msg
+            or "API key" in error_msg.lower() or "leaked" in error_msg.lower())
+
 def translate_batch_gemini(sentences, glossary=None):
     """
     Translate batch of sentences - OPTIMIZED: Batch in chunks to balance speed and structure preservation
+    Chunks are translated concurrently when httpx is available, so total wall
+    time approaches the slowest round-trip instead of the sum of all of them
     """
     if glossary is None:
         glossary = GlossaryLoader()
     
     if not sentences or all(not s.strip() for s in sentences):
         return [""] * len(sentences)
+
+    # Deduplicate before chunking: identical segments (repeated headers,
+    # boilerplate rows) would otherwise be sent - and billed - once per
+    # occurrence. Whitespace-only segments short-circuit to "" without
+    # consuming quota. uniq maps each distinct sentence to the positions
+    # it occupies in the original list.
+    uniq = {}
+    for i, s in enumerate(sentences):
+        if s.strip():
+            uniq.setdefault(s, []).append(i)
+    unique_sentences = list(uniq)
+    if len(unique_sentences) < sum(len(v) for v in uniq.values()):
+        print(f"[Gemini] Deduplicated {len(sentences)} segments to {len(unique_sentences)} unique")
+
+    # Pack sentences into chunks by estimated token count rather than a
+    # fixed sentence count: 15 long paragraphs could overflow the output
+    # budget (truncated translations), while 15 one-line table cells
+    # wasted a whole round-trip on a tiny prompt. ~4 chars/token is a
+    # good enough estimate for English; the target leaves headroom under
+    # maxOutputTokens since Telugu output runs longer than its source.
+    target_tokens = 3000
+    chunks = []
+    current, current_tokens = [], 0
+    for s in unique_sentences:
+        toks = max(1, len(s) // 4)
+        if current and current_tokens + toks > target_tokens:
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(s)
+        current_tokens += toks
+    if current:
+        chunks.append(current)
+    chunk_texts = [SEPARATOR.join(chunk) for chunk in chunks]
     
-    # Batch sentences in larger chunks for maximum speed
-    # This is much faster than sentence-by-sentence but still preserves structure
-    chunk_size = 15  # Process 15 sentences at a time for faster translation
-    translations = []
+    if HAS_HTTPX and len(chunks) > 1:
+        # Overlap the HTTP round-trips (bounded by _ASYNC_CONCURRENCY)
+        results = asyncio.run(_translate_chunks_async(chunk_texts, glossary))
+    else:
+        results = []
+        for chunk_text in chunk_texts:
+            try:
+                results.append(translate_with_gemini(chunk_text, glossary))
+            except Exception as e:
+                results.append(e)
     
-    for chunk_start in range(0, len(sentences), chunk_size):
-        chunk = sentences[chunk_start:chunk_start + chunk_size]
-        
-        # Join chunk with separator
-        chunk_text = SEPARATOR.join(chunk)
-        
-        try:
-            # Translate the chunk
-            translated_chunk = translate_with_gemini(chunk_text, glossary)
-            
-            # Split back by separator
-            # Clean up any corrupted separator patterns
-            translated_chunk = re.sub(r'\|{3,}', SEPARATOR, translated_chunk)
-            translated_chunk = translated_chunk.replace("|||SEGMENT|||", SEPARATOR)
-            translated_chunk = translated_chunk.replace("||||||", SEPARATOR)
-            
-            chunk_translations = translated_chunk.split(SEPARATOR)
-            
-            # Ensure we have the right number of translations
-            while len(chunk_translations) < len(chunk):
-                chunk_translations.append("")
-            
-            translations.extend(chunk_translations[:len(chunk)])
-            
-        except Exception as e:
-            error_msg = str(e)
-            print(f"[Gemini] ERROR translating chunk {chunk_start//chunk_size + 1}: {error_msg}")
-            import traceback
-            print(traceback.format_exc())
+    translations = []
+    for idx, (chunk, result) in enumerate(zip(chunks, results)):
+        if isinstance(result, Exception):
+            error_msg = str(result)
+            print(f"[Gemini] ERROR translating chunk {idx + 1}: {error_msg}")
             
             # Check if it's an API key error - provide helpful message and continue with original text
-            if "403" in error_msg or "PERMISSION_DENIED" in error_msg or "API key" in error_msg.lower() or "leaked" in error_msg.lower():
+            if _is_api_key_error(error_msg):
                 print(f"[Gemini] WARNING: API key issue detected. Please update GEMINI_API_KEY in .env file")
                 print(f"[Gemini] Returning original text for this chunk so other engines can continue")
                 # Return original sentences for this chunk so other engines can still work
                 translations.extend(chunk)
             else:
                 # For other errors, raise exception
-                raise Exception(f"Gemini batch translation failed at chunk {chunk_start//chunk_size + 1}: {error_msg}")
-        
+                raise Exception(f"Gemini batch translation failed at chunk {idx + 1}: {error_msg}")
+        else:
+            translations.extend(_split_translated_chunk(result, chunk))
+
         # Progress indicator
-        if (chunk_start + chunk_size) % 20 == 0 or chunk_start + chunk_size >= len(sentences):
-            print(f"Translated {min(chunk_start + chunk_size, len(sentences))}/{len(sentences)} segments...")
-    
-    return translations
\ No newline at end of file
+        if len(translations) % 20 == 0 or len(translations) >= len(unique_sentences):
+            print(f"Translated {min(len(translations), len(unique_sentences))}/{len(unique_sentences)} unique segments...")
+
+    # Scatter each unique translation back to every position it came from;
+    # skipped whitespace-only slots stay ""
+    out = [""] * len(sentences)
+    for translated, positions in zip(translations, uniq.values()):
+        for i in positions:
+            out[i] = translated
+    return out
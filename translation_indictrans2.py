@@ -10,6 +10,16 @@ from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
 from IndicTransToolkit.processor import IndicProcessor
 from glossary import apply_glossary, get_glossary
 import threading
+from functools import lru_cache
+
+# Optional CTranslate2 backend - converted model dirs (see
+# scripts/convert_indictrans2_ct2.py) run a C++ beam search with int8
+# kernels instead of the Python HF generate loop
+try:
+    import ctranslate2
+    HAS_CT2 = True
+except ImportError:
+    HAS_CT2 = False
 
 load_dotenv()
 HF_TOKEN = os.getenv("HF_TOKEN")
@@ -17,6 +27,10 @@ HF_TOKEN = os.getenv("HF_TOKEN")
 # Thread lock for model access (PyTorch models need thread-safe access)
 _model_lock = threading.Lock()
 
+# Sentences per generate() call when batch-translating; buckets are padded
+# to their own longest member rather than the global longest
+_BUCKET_SIZE = 32
+
 # Language mappings
 LANGUAGES = {
     "Assamese": "asm_Beng",
@@ -47,11 +61,13 @@ LANGUAGES = {
     "Urdu": "urd_Arab"
 }
 
+@lru_cache(maxsize=64)
 def get_language_code(lang):
     """
     Returns the language code for a given language name.
     If the input is already a valid code, returns it.
     Returns None if not found.
+    Memoized - translate() resolves the same pair on every call.
     """
     if lang in LANGUAGES:
         return LANGUAGES[lang]
@@ -97,11 +113,27 @@ class IndicTrans2Translator:
         
         self.src_lang = src_lang
         self.target_lang = target_lang
+        # Optional CTranslate2 model directory (produced offline by
+        # scripts/convert_indictrans2_ct2.py); when set and loadable, the
+        # HF model is bypassed entirely
+        self.ct2_dir = os.getenv("INDICTRANS2_CT2_DIR")
+        self._ct2_translator = None
         self._model = None
         self._tokenizer = None
         self._processor = None
         self._initialized = False
         
+    def _to_device(self, inputs):
+        """
+        Move tokenizer output to the model device. On CUDA the host tensors
+        are pinned and copied with non_blocking=True, letting the H2D
+        transfer overlap with the next bucket's CPU-side preprocessing.
+        """
+        if "cuda" in self.device:
+            return {k: v.pin_memory().to(self.device, non_blocking=True)
+                    for k, v in inputs.items()}
+        return inputs.to(self.device)
+
     def _initialize(self):
         """Lazy initialization of the model - thread-safe"""
         if self._initialized:
@@ -116,43 +148,150 @@ class IndicTrans2Translator:
             try:
                 print(f"[IndicTrans2] Loading model {self.model_name} on {self.device}...")
                 
-                self._tokenizer = AutoTokenizer.from_pretrained(
-                    self.model_name, 
-                    trust_remote_code=True, 
-                    token=HF_TOKEN
-                )
-                
-                # Determine torch_dtype and attn_implementation based on device
-                torch_dtype = torch.float16 if "cuda" in self.device else torch.float32
-                attn_implementation = "flash_attention_2" if "cuda" in self.device else "eager"
-                
+                # Prefer the Rust "fast" tokenizer when the checkpoint ships
+                # one - tokenizing thousands of document segments through the
+                # Python tokenizer can rival inference time on large docs
                 try:
-                    self._model = AutoModelForSeq2SeqLM.from_pretrained(
-                        self.model_name, 
-                        trust_remote_code=True, 
-                        torch_dtype=torch_dtype, 
-                        attn_implementation=attn_implementation,
+                    self._tokenizer = AutoTokenizer.from_pretrained(
+                        self.model_name,
+                        use_fast=True,
+                        trust_remote_code=True,
                         token=HF_TOKEN
-                    ).to(self.device)
+                    )
                 except Exception as e:
-                    print(f"[IndicTrans2] Failed to load with {attn_implementation}, falling back to eager execution. Error: {e}")
-                    self._model = AutoModelForSeq2SeqLM.from_pretrained(
-                        self.model_name, 
-                        trust_remote_code=True, 
-                        torch_dtype=torch_dtype, 
-                        attn_implementation="eager",
+                    print(f"[IndicTrans2] Fast tokenizer unavailable ({e}); using slow tokenizer")
+                    self._tokenizer = AutoTokenizer.from_pretrained(
+                        self.model_name,
+                        trust_remote_code=True,
                         token=HF_TOKEN
-                    ).to(self.device)
-                    
+                    )
+                
+                # CTranslate2 backend: if a converted model dir is configured
+                # and the library is installed, load it and skip the HF model
+                if self.ct2_dir and HAS_CT2 and os.path.isdir(self.ct2_dir):
+                    ct2_device = "cuda" if "cuda" in self.device else "cpu"
+                    self._ct2_translator = ctranslate2.Translator(self.ct2_dir, device=ct2_device)
+                    self._processor = IndicProcessor(inference=True)
+                    self._initialized = True
+                    print(f"[IndicTrans2] Loaded CTranslate2 model from {self.ct2_dir} on {ct2_device}")
+                    return
+                elif self.ct2_dir:
+                    print(f"[IndicTrans2] INDICTRANS2_CT2_DIR set but unusable "
+                          f"(installed: {HAS_CT2}, dir exists: {os.path.isdir(self.ct2_dir)}); "
+                          f"falling back to HF model")
+
+                # Determine torch_dtype based on device. Prefer BF16 on GPUs
+                # that support it (Ampere+): same memory footprint as FP16 but
+                # FP32 dynamic range, so attention logits don't overflow on
+                # long sentences. FP16 fallback for older GPUs, FP32 on CPU.
+                if "cuda" in self.device:
+                    if torch.cuda.is_bf16_supported():
+                        torch_dtype = torch.bfloat16
+                    else:
+                        torch_dtype = torch.float16
+                else:
+                    torch_dtype = torch.float32
+                print(f"[IndicTrans2] Using dtype: {torch_dtype}")
+
+                # Attention backend preference: FlashAttention-2 (CUDA only),
+                # then PyTorch's fused SDPA kernels (work on CPU and CUDA),
+                # then plain eager attention as the last resort
+                if "cuda" in self.device:
+                    attn_candidates = ["flash_attention_2", "sdpa", "eager"]
+                else:
+                    attn_candidates = ["sdpa", "eager"]
+
+                last_error = None
+                for attn_implementation in attn_candidates:
+                    try:
+                        self._model = AutoModelForSeq2SeqLM.from_pretrained(
+                            self.model_name,
+                            trust_remote_code=True,
+                            torch_dtype=torch_dtype,
+                            attn_implementation=attn_implementation,
+                            token=HF_TOKEN
+                        ).to(self.device)
+                        print(f"[IndicTrans2] Loaded with attn_implementation={attn_implementation}")
+                        break
+                    except Exception as e:
+                        print(f"[IndicTrans2] Failed to load with {attn_implementation}, trying next backend. Error: {e}")
+                        last_error = e
+                else:
+                    raise last_error
+
+                # Let SDPA dispatch to the flash / memory-efficient fused
+                # kernels when it runs on CUDA
+                if "cuda" in self.device:
+                    torch.backends.cuda.enable_flash_sdp(True)
+                    torch.backends.cuda.enable_mem_efficient_sdp(True)
+
+                # One shared IndicProcessor serves every language pair: the
+                # lang codes are per-call arguments to preprocess_batch /
+                # postprocess_batch, so there is no per-pair state to rebuild
+                # (and nothing to gain from a per-pair instance cache)
                 self._processor = IndicProcessor(inference=True)
                 self._model.eval()
+
+                # Enable the KV cache so each beam-search decode step reuses
+                # past self/cross attention instead of recomputing from scratch
+                self._model.generation_config.use_cache = True
+                # Pin pad_token_id explicitly so padding="longest" batches don't
+                # thrash the cache shape between calls
+                if self._tokenizer.pad_token_id is not None:
+                    self._model.generation_config.pad_token_id = self._tokenizer.pad_token_id
+
+                # Optional INT8 dynamic quantization for CPU serving: halves
+                # the bytes moved for Linear weights and uses int8 GEMM kernels
+                # on VNNI-capable CPUs. Opt-in via INDICTRANS2_INT8=1 because
+                # it can regress on CPUs without VNNI support.
+                if self.device == "cpu" and os.getenv("INDICTRANS2_INT8", "").lower() in ("1", "true", "yes"):
+                    try:
+                        if "onednn" in torch.backends.quantized.supported_engines:
+                            torch.backends.quantized.engine = "onednn"
+                        self._model = torch.ao.quantization.quantize_dynamic(
+                            self._model, {torch.nn.Linear}, dtype=torch.qint8
+                        )
+                        print(f"[IndicTrans2] Applied INT8 dynamic quantization (engine: {torch.backends.quantized.engine})")
+                    except Exception as e:
+                        print(f"[IndicTrans2] INT8 quantization failed, keeping FP32 weights: {e}")
                 
                 # Set CUDA device explicitly if using GPU
                 if self.device == "cuda":
                     torch.cuda.set_device(0)
                     # Ensure model is on the correct CUDA device
                     self._model = self._model.cuda()
-                
+
+                # torch.compile fuses elementwise + matmul epilogues and cuts
+                # Python frame overhead across the many forward calls generate
+                # makes. dynamic=True because padding="longest" gives variable
+                # sequence lengths (static shapes would recompile per shape).
+                # Disable with INDICTRANS2_NO_COMPILE=1 if the compiled path
+                # misbehaves on a given stack.
+                if os.getenv("INDICTRANS2_NO_COMPILE", "").lower() not in ("1", "true", "yes"):
+                    try:
+                        compiled = torch.compile(
+                            self._model, mode="reduce-overhead",
+                            fullgraph=False, dynamic=True
+                        )
+                        # Warm up now so the first real request doesn't pay
+                        # the compilation latency (we already hold _model_lock)
+                        warm = self._processor.preprocess_batch(
+                            ["warmup"], src_lang="eng_Latn", tgt_lang="tel_Telu"
+                        )
+                        warm_inputs = self._tokenizer(
+                            warm,
+                            truncation=True,
+                            padding="longest",
+                            return_tensors="pt",
+                            return_attention_mask=True,
+                        ).to(self.device)
+                        with torch.no_grad():
+                            compiled.generate(**warm_inputs, max_length=32, num_beams=1)
+                        self._model = compiled
+                        print("[IndicTrans2] torch.compile enabled and warmed up")
+                    except Exception as e:
+                        print(f"[IndicTrans2] torch.compile unavailable, using eager model: {e}")
+
                 self._initialized = True
                 
                 # Extensive verification for GPU (RTX 5090)
@@ -220,11 +359,14 @@ class IndicTrans2Translator:
             
             if not self._initialized:
                 raise Exception("Model initialization failed - _initialized is False")
-            
-            if self._model is None:
+
+            if self._model is None and self._ct2_translator is None:
                 raise Exception("Model is None after initialization")
-            
-            print(f"[IndicTrans2] Model ready. Device: {self.device}, Model on: {next(self._model.parameters()).device}")
+
+            if self._ct2_translator is not None:
+                print(f"[IndicTrans2] Model ready. Device: {self.device}, Backend: ctranslate2")
+            else:
+                print(f"[IndicTrans2] Model ready. Device: {self.device}, Model on: {next(self._model.parameters()).device}")
             print(f"[IndicTrans2] Translating text (length: {len(text)}) from {src_lang} to {tgt_lang}")
             
             # Get language codes
@@ -254,14 +396,46 @@ class IndicTrans2Translator:
                 tgt_lang=tgt_code,
             )
             
+            # CTranslate2 path: tokenize to token strings and run the C++
+            # beam search, bypassing the HF generate loop entirely
+            if self._ct2_translator is not None:
+                source_tokens = [
+                    self._tokenizer.convert_ids_to_tokens(
+                        self._tokenizer(sentence, truncation=True, max_length=max_length).input_ids
+                    )
+                    for sentence in batch
+                ]
+                results = self._ct2_translator.translate_batch(
+                    source_tokens,
+                    beam_size=num_beams,
+                    max_decoding_length=max_length,
+                )
+                generated_tokens = [
+                    self._tokenizer.decode(
+                        self._tokenizer.convert_tokens_to_ids(result.hypotheses[0]),
+                        skip_special_tokens=True,
+                        clean_up_tokenization_spaces=False,
+                    )
+                    for result in results
+                ]
+                translations = self._processor.postprocess_batch(generated_tokens, lang=tgt_code)
+                translated = translations[0] if translations else text
+
+                # Apply glossary AFTER translation to enforce terminology
+                if translated and translated != text:
+                    for _ in range(3):
+                        translated = apply_glossary(translated, glossary, strict_mode=True)
+
+                return translated
+
             # Tokenize
-            inputs = self._tokenizer(
+            inputs = self._to_device(self._tokenizer(
                 batch,
                 truncation=True,
                 padding="longest",
                 return_tensors="pt",
                 return_attention_mask=True,
-            ).to(self.device)
+            ))
             
             # Generate translation - use lock for thread safety
             print(f"[IndicTrans2] Starting model.generate() on {self.device}...")
@@ -272,20 +446,22 @@ class IndicTrans2Translator:
                 with torch.no_grad():
                     generated_tokens = self._model.generate(
                         **inputs,
-                        use_cache=False,
+                        use_cache=True,
                         min_length=0,
                         max_length=max_length,
                         num_beams=num_beams,
                         num_return_sequences=1,
+                        early_stopping=True,
                     )
                 print(f"[IndicTrans2] Model.generate() completed. Output shape: {generated_tokens.shape}")
             print(f"[IndicTrans2] Model lock released")
             
-            # Decode
+            # Decode. HF's clean_up_tokenization_spaces is a per-sentence
+            # regex pass that IndicProcessor.postprocess_batch makes redundant
             generated_tokens = self._tokenizer.batch_decode(
                 generated_tokens,
                 skip_special_tokens=True,
-                clean_up_tokenization_spaces=True,
+                clean_up_tokenization_spaces=False,
             )
             
             # Postprocess
@@ -343,10 +519,13 @@ class IndicTrans2Translator:
             if not self._initialized:
                 raise Exception("Model initialization failed - _initialized is False")
             
-            if self._model is None:
+            if self._model is None and self._ct2_translator is None:
                 raise Exception("Model is None after initialization")
-            
-            print(f"[IndicTrans2] Model ready for batch. Device: {self.device}, Model on: {next(self._model.parameters()).device}")
+
+            if self._ct2_translator is not None:
+                print(f"[IndicTrans2] Model ready for batch. Device: {self.device}, Backend: ctranslate2")
+            else:
+                print(f"[IndicTrans2] Model ready for batch. Device: {self.device}, Model on: {next(self._model.parameters()).device}")
         except Exception as e:
             print(f"[IndicTrans2] Failed to initialize model: {str(e)}")
             import traceback
@@ -354,57 +533,127 @@ class IndicTrans2Translator:
             # Return original sentences with glossary applied on error
             return [apply_glossary(sentence, glossary, strict_mode=True) for sentence in sentences]
         
-        # Translate each sentence individually
-        translated_sentences = []
-        
-        print(f"[IndicTrans2] Translating batch: {len(sentences)} sentences individually...")
-        
-        for i, sentence in enumerate(sentences):
-            if not sentence or not sentence.strip():
-                translated_sentences.append("")
-                continue
-            
-            try:
-                print(f"[IndicTrans2] Translating sentence {i+1}/{len(sentences)} (length: {len(sentence)})")
-                
-                # Use translate method for each sentence
-                translated = self.translate(
-                    sentence, 
-                    glossary=glossary, 
-                    src_lang=src_lang, 
-                    tgt_lang=tgt_lang,
-                    max_length=max_length,
-                    num_beams=num_beams
+        # Get language codes once for the whole batch
+        src_code = get_language_code(src_lang)
+        tgt_code = get_language_code(tgt_lang)
+
+        if not src_code or not tgt_code:
+            print(f"[IndicTrans2] Error: Unsupported language pair '{src_lang}' -> '{tgt_lang}'")
+            print_supported_languages()
+            return [apply_glossary(sentence, glossary, strict_mode=True) for sentence in sentences]
+
+        # Keep original positions; empty sentences pass through untouched
+        indexed = [(i, s) for i, s in enumerate(sentences) if s and s.strip()]
+        translated_sentences = [""] * len(sentences)
+
+        print(f"[IndicTrans2] Translating batch: {len(indexed)} non-empty sentences...")
+
+        try:
+            batch = self._processor.preprocess_batch(
+                [s for _, s in indexed],
+                src_lang=src_code,
+                tgt_lang=tgt_code,
+            )
+
+            if self._ct2_translator is not None:
+                # CTranslate2 batches variable-length inputs itself, so no
+                # bucketing is needed on this path
+                source_tokens = [
+                    self._tokenizer.convert_ids_to_tokens(
+                        self._tokenizer(text, truncation=True, max_length=max_length).input_ids
+                    )
+                    for text in batch
+                ]
+                ct2_results = self._ct2_translator.translate_batch(
+                    source_tokens,
+                    beam_size=num_beams,
+                    max_decoding_length=max_length,
                 )
-                
-                translated_sentences.append(translated)
-                
-            except Exception as e:
-                print(f"[IndicTrans2] Translation error for sentence {i+1}: {str(e)}")
-                import traceback
-                traceback.print_exc()
-                # Don't silently continue - raise the exception to fail fast
-                # This will help identify the issue
-                raise Exception(f"Failed to translate sentence {i+1}/{len(sentences)}: {str(e)}") from e
-        
+                decoded = [
+                    self._tokenizer.decode(
+                        self._tokenizer.convert_tokens_to_ids(result.hypotheses[0]),
+                        skip_special_tokens=True,
+                        clean_up_tokenization_spaces=False,
+                    )
+                    for result in ct2_results
+                ]
+                results = self._processor.postprocess_batch(decoded, lang=tgt_code)
+            else:
+                # Sort by token length and bucket so each bucket only pads to
+                # its own longest member - with padding="longest" over the
+                # whole batch, one long sentence would force padding (and
+                # wasted FLOPs) onto every other row
+                encoded = self._tokenizer(batch, truncation=True, max_length=max_length)
+                lengths = [len(ids) for ids in encoded.input_ids]
+                order = sorted(range(len(batch)), key=lengths.__getitem__)
+
+                results = [None] * len(batch)
+                for start in range(0, len(order), _BUCKET_SIZE):
+                    bucket = order[start:start + _BUCKET_SIZE]
+                    inputs = self._to_device(self._tokenizer.pad(
+                        {"input_ids": [encoded.input_ids[i] for i in bucket]},
+                        padding="longest",
+                        return_tensors="pt",
+                    ))
+
+                    with _model_lock:
+                        with torch.no_grad():
+                            generated_tokens = self._model.generate(
+                                **inputs,
+                                use_cache=True,
+                                min_length=0,
+                                max_length=max_length,
+                                num_beams=num_beams,
+                                num_return_sequences=1,
+                                early_stopping=True,
+                            )
+
+                    decoded = self._tokenizer.batch_decode(
+                        generated_tokens,
+                        skip_special_tokens=True,
+                        clean_up_tokenization_spaces=False,
+                    )
+                    # Scatter bucket outputs back to their pre-sort positions
+                    for i, translation in zip(bucket, self._processor.postprocess_batch(decoded, lang=tgt_code)):
+                        results[i] = translation
+
+            # Apply glossary AFTER translation to enforce terminology
+            for (orig_idx, source), translated in zip(indexed, results):
+                if translated and translated != source:
+                    for _ in range(3):
+                        translated = apply_glossary(translated, glossary, strict_mode=True)
+                translated_sentences[orig_idx] = translated or ""
+
+        except Exception as e:
+            print(f"[IndicTrans2] Batch translation error: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            # Don't silently continue - raise the exception to fail fast
+            raise Exception(f"Failed to translate batch of {len(indexed)} sentences: {str(e)}") from e
+
         print(f"[IndicTrans2] Batch translation completed: {len(translated_sentences)} sentences")
         return translated_sentences
 
-# Global instance (lazy loaded)
+# Global instance (lazy loaded) - guarded by its own lock so concurrent
+# first requests never construct (and later load) two copies of the model
 _indictrans2_instance = None
+_instance_lock = threading.Lock()
 
 def get_indictrans2_translator(src_lang="en", target_lang="te", model_name=None):
-    """Get or create global IndicTrans2 translator instance"""
+    """Get or create global IndicTrans2 translator instance (thread-safe)"""
     global _indictrans2_instance
     if _indictrans2_instance is None:
-        # Use default model name if not provided
-        if model_name is None:
-            model_name = "ai4bharat/indictrans2-en-indic-1B"
-        _indictrans2_instance = IndicTrans2Translator(
-            model_name=model_name,
-            src_lang=src_lang,
-            target_lang=target_lang
-        )
+        with _instance_lock:
+            # Double-check after acquiring lock (another thread might have created it)
+            if _indictrans2_instance is None:
+                # Use default model name if not provided
+                if model_name is None:
+                    model_name = "ai4bharat/indictrans2-en-indic-1B"
+                _indictrans2_instance = IndicTrans2Translator(
+                    model_name=model_name,
+                    src_lang=src_lang,
+                    target_lang=target_lang
+                )
     return _indictrans2_instance
 
 def translate_with_indictrans2(text, glossary=None, src_lang="en", target_lang="te"):
@@ -412,7 +661,8 @@ def translate_with_indictrans2(text, glossary=None, src_lang="en", target_lang="
     translator = get_indictrans2_translator(src_lang=src_lang, target_lang=target_lang)
     return translator.translate(text, glossary=glossary, src_lang="English", tgt_lang="Telugu")
 
-def translate_batch_indictrans2(sentences, glossary=None, src_lang="en", target_lang="te"):
+def translate_batch_indictrans2(sentences, glossary=None, src_lang="en", target_lang="te", num_beams=5):
     """Translate batch using IndicTrans2 (local inference)"""
     translator = get_indictrans2_translator(src_lang=src_lang, target_lang=target_lang)
-    return translator.translate_batch(sentences, glossary=glossary, src_lang="English", tgt_lang="Telugu")
+    return translator.translate_batch(sentences, glossary=glossary, src_lang="English", tgt_lang="Telugu",
+                                      num_beams=num_beams)